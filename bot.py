@@ -53,14 +53,27 @@ import os
 import sys
 import discord
 import pandas as pd
+import numpy as np
 import aiohttp
 from discord.ext import commands
 from discord import app_commands
 from dotenv import load_dotenv
 from datetime import datetime, timezone, timedelta
 
+# Prefer the fast upb protobuf runtime; must be set before the first
+# google.protobuf import in the process (track.py guards this too).
+os.environ.setdefault("PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION", "upb")
 from google.transit import gtfs_realtime_pb2
 import re
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+# RapidFuzz gives much better (and faster) fuzzy stop matching than the
+# substring scan; fall back to the pandas path if it isn't installed.
+try:
+    from rapidfuzz import process as rf_process, fuzz as rf_fuzz
+except ImportError:
+    rf_process = None
 
 # Helper to split long strings into chunks <= max_len, preferring to break at newlines.
 def split_message(text: str, max_len: int = 1990):
@@ -466,7 +479,7 @@ async def build_status_message(limit_routes: int = 40, settings: dict | None = N
     try:
         rail_routes = routes[routes.get('route_type', '').astype(str) == '2']
     except Exception:
-        rail_routes = routes.copy()
+        rail_routes = routes  # read-only fallback; no need to copy the frame
 
     for _, r in rail_routes.iterrows():
         route_id = r['route_id']
@@ -783,6 +796,7 @@ async def network_status_loop():
     - falls back to sending a diagnostic DM to the bot owner if posting repeatedly fails
     """
     await bot.wait_until_ready()
+    await gtfs_ready.wait()
 
     if not STATUS_CHANNEL_ID:
         print("STATUS_CHANNEL_ID not configured; skipping network status loop.")
@@ -956,21 +970,41 @@ def hex_to_rgb(hex_color: str):
     hex_color = hex_color.strip().lstrip("#")
     if len(hex_color) != 6:
         return (0, 0, 0)  # fallback to black
-    r = int(hex_color[0:2], 16)
-    g = int(hex_color[2:4], 16)
-    b = int(hex_color[4:6], 16)
-    return (r, g, b)
-
+    try:
+        b = bytes.fromhex(hex_color)  # one C call instead of three int-from-str parses
+    except ValueError:
+        return (0, 0, 0)
+    return (b[0], b[1], b[2])
+
+# ANSI palette as arrays so nearest-colour matching can run as one NumPy kernel.
+# int32, not int16: a squared channel difference can reach 255**2 = 65025,
+# which wraps negative in int16 and makes argmin pick far-away colours.
+ANSI_CODES = np.array(list(ansi_colours.keys()))
+ANSI_RGB = np.array(list(ansi_colours.values()), dtype=np.int32)
+
+def nearest_ansi(hex_list):
+    """Vectorized nearest-ANSI match: returns an array of codes for a list of hex colours."""
+    rgb = np.array([hex_to_rgb(h) for h in hex_list], dtype=np.int32)
+    d = ((rgb[:, None, :] - ANSI_RGB[None, :, :]) ** 2).sum(-1)
+    return ANSI_CODES[d.argmin(1)]
+
+@functools.lru_cache(maxsize=256)
 def closest_ansi_color(hex_color: str) -> str:
     """Finds the closest ANSI color code for a given hex color."""
-    target_rgb = hex_to_rgb(hex_color)
-
-    def distance(c1, c2):
-        """Calculates the Euclidean distance between two RGB colors."""
-        return sum((a - b) ** 2 for a, b in zip(c1, c2))
+    cleaned = hex_color.strip().lstrip("#")
+    try:
+        rgb_int = int(cleaned, 16)
+    except ValueError:
+        rgb_int = 0
+    # unpack with shifts instead of building an intermediate array per call;
+    # int32 to match ANSI_RGB — int16 squared differences overflow
+    rgb = np.array([(rgb_int >> 16) & 0xFF, (rgb_int >> 8) & 0xFF, rgb_int & 0xFF], dtype=np.int32)
+    d = ((ANSI_RGB - rgb) ** 2).sum(1)
+    return ANSI_CODES[int(d.argmin())]
 
-    closest = min(ansi_colours.items(), key=lambda item: distance(target_rgb, item[1]))
-    return closest[0]  # returns "31", "32", etc.
+# Regression check for the int16 overflow that mapped black and red to white;
+# the lru_cache would otherwise pin a wrong code for the process lifetime.
+assert closest_ansi_color("000000") == "30" and closest_ansi_color("FF0000") == "31"
 
 
 
@@ -1039,31 +1073,323 @@ gtfs_path = "SEQ_GTFS"  # Will need a way to automatically update this.
 if gtfs_path is None or not os.path.exists(gtfs_path):
     raise ValueError("GTFS static data path is not set or does not exist, and automatic DownloadOnBoot initialisation failed. Please check GTFS_STATIC_URL / DownloadOnBoot.")
 
-# Load GTFS data into pandas DataFrames
-routes = pd.read_csv(os.path.join(gtfs_path, "routes.txt"))
-trips = pd.read_csv(os.path.join(gtfs_path, "trips.txt"))
-stops = pd.read_csv(os.path.join(gtfs_path, "stops.txt"))
-stop_times = pd.read_csv(os.path.join(gtfs_path, "stop_times.txt"))
+# Narrow dtypes for the GTFS loads: categorical ids make isin/== masks compare
+# integer codes instead of hashing strings, and small ints shrink stop_times by
+# several fold — the masks in /view and /timetable become memory-bound on far
+# fewer bytes. direction_id is nullable Int8 in case a feed omits values.
+GTFS_DTYPES = {
+    "routes": {"route_id": "category"},
+    "trips": {"trip_id": "category", "route_id": "category", "service_id": "category",
+              "direction_id": "Int8", "trip_headsign": "category"},
+    "stops": {"stop_id": "category", "parent_station": "category", "location_type": "Int8"},
+    "stop_times": {"trip_id": "category", "stop_id": "category", "stop_sequence": "int32"},
+}
 
-# precompute a fast mapping from stop_id -> set(route_id) to avoid heavy pandas work inside the async loop
-try:
-    # stop_times typically doesn't include route_id; join via trips.trip_id -> route_id
-    if 'trip_id' in stop_times.columns and 'route_id' in trips.columns:
-        _stops_routes = stop_times.merge(trips[['trip_id','route_id']], on='trip_id', how='left')
-        # normalize stop_id and route_id to strings trimmed of whitespace
-        _stops_routes['stop_id'] = _stops_routes['stop_id'].astype(str).str.strip()
-        _stops_routes['route_id'] = _stops_routes['route_id'].astype(str).str.strip()
-        stop_to_routes = _stops_routes.groupby('stop_id')['route_id'].apply(lambda s: set(s.dropna())).to_dict()
-    else:
+# Only the columns the bot actually reads — skipping the rest keeps the
+# tokenizer off shape_dist_traveled, stop coordinates, URLs etc. and roughly
+# halves the resident size of stop_times.
+GTFS_USECOLS = {
+    "routes": ["route_id", "route_short_name", "route_long_name", "route_color", "route_type"],
+    "trips": ["trip_id", "route_id", "service_id", "direction_id", "trip_headsign"],
+    "stops": ["stop_id", "stop_name", "parent_station", "location_type"],
+    "stop_times": ["trip_id", "arrival_time", "stop_id", "stop_sequence"],
+}
+
+def _read_gtfs_table(name):
+    """Read a GTFS table, preferring a cached columnar copy over CSV parsing.
+
+    The first load converts <name>.txt into .cache/<name>.parquet; subsequent
+    restarts load the mmap-friendly columnar file instead of re-tokenizing the
+    CSV (stop_times.txt is the long pole). Falls back to plain read_csv when
+    pyarrow/parquet support is unavailable or the cache is stale/broken.
+    """
+    csv_path = os.path.join(gtfs_path, name + ".txt")
+    cache_dir = os.path.join(gtfs_path, ".cache")
+    cache_path = os.path.join(cache_dir, name + ".parquet")
+    sig_path = cache_path + ".sig"
+    # Signature of the source CSV. mtime alone can lie when a re-downloaded
+    # feed lands with an older timestamp, so size is folded in as well.
+    st = os.stat(csv_path)
+    csv_sig = f"{st.st_mtime_ns}:{st.st_size}"
+    try:
+        if os.path.exists(cache_path):
+            with open(sig_path) as f:
+                if f.read().strip() == csv_sig:
+                    return pd.read_parquet(cache_path, columns=GTFS_USECOLS.get(name))
+    except Exception as e:
+        print(f"warning reading cached {name}.parquet, falling back to CSV:", e)
+    df = pd.read_csv(csv_path, dtype=GTFS_DTYPES.get(name), usecols=GTFS_USECOLS.get(name))
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        df.to_parquet(cache_path, compression="zstd")
+        with open(sig_path, "w") as f:
+            f.write(csv_sig)
+    except Exception as e:
+        print(f"warning writing {name}.parquet cache (pyarrow missing?):", e)
+    return df
+
+# GTFS dataframes and derived lookups; populated by load_gtfs() in a worker
+# thread after gateway login so the bot can answer READY without waiting for
+# hundreds of MB of tables to parse. Commands wait on gtfs_ready first.
+routes = None
+trips = None
+stops = None
+stop_times = None
+stop_to_routes = {}
+route_lookup = {}
+trip_lookup = {}
+stop_names = []
+stop_name_by_id = {}
+stop_by_id = {}
+stop_id_by_name_lower = {}
+stop_names_lower = []
+stop_ids_list = []
+children_by_parent = {}
+trip_ids_by_route_dir = {}
+route_mode_lookup = {}
+route_by_short = {}
+trip_time_index = {}
+route_ansi = {}
+
+gtfs_ready = asyncio.Event()
+
+def load_gtfs():
+    """Load the GTFS tables and build every derived lookup the commands use."""
+    global routes, trips, stops, stop_times, stop_to_routes
+    global route_lookup, trip_lookup, stop_names, stop_name_by_id
+    global stop_by_id, stop_id_by_name_lower, children_by_parent
+    global stop_names_lower, stop_ids_list, trip_ids_by_route_dir
+    global route_mode_lookup, route_by_short
+    global trip_time_index, route_ansi
+
+    # read_csv/read_parquet release the GIL in their C cores, so the four
+    # tables parse concurrently; wall time is roughly just stop_times.
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        routes, trips, stops, stop_times = pool.map(
+            _read_gtfs_table, ["routes", "trips", "stops", "stop_times"]
+        )
+
+    # precompute a fast mapping from stop_id -> set(route_id) to avoid heavy pandas work inside the async loop
+    try:
+        # stop_times typically doesn't include route_id; join via trips.trip_id -> route_id
+        if 'trip_id' in stop_times.columns and 'route_id' in trips.columns:
+            _stops_routes = stop_times.merge(trips[['trip_id','route_id']], on='trip_id', how='left')
+            # normalize stop_id and route_id to strings trimmed of whitespace
+            _stops_routes['stop_id'] = _stops_routes['stop_id'].astype(str).str.strip()
+            _stops_routes['route_id'] = _stops_routes['route_id'].astype(str).str.strip()
+            stop_to_routes = _stops_routes.groupby('stop_id')['route_id'].apply(lambda s: set(s.dropna())).to_dict()
+        else:
+            stop_to_routes = {}
+    except Exception as e:
+        print('warning building stop->routes map:', e)
         stop_to_routes = {}
-except Exception as e:
-    print('warning building stop->routes map:', e)
-    stop_to_routes = {}
 
-# Create lookup dictionaries for faster data access
-route_lookup = routes.set_index("route_id")[["route_short_name", "route_long_name", "route_color"]].to_dict("index")
-trip_lookup = trips.set_index("trip_id")["trip_headsign"].to_dict()
-stop_names = stops["stop_name"].tolist()
+    # Create lookup dictionaries for faster data access
+    route_lookup = routes.set_index("route_id")[["route_short_name", "route_long_name", "route_color"]].to_dict("index")
+    trip_lookup = trips.set_index("trip_id")["trip_headsign"].to_dict()
+    stop_names = stops["stop_name"].tolist()
+    # O(1) stop_id -> stop_name lookup so /timetable doesn't re-scan stops per row
+    stop_name_by_id = {str(k).strip(): v for k, v in zip(stops["stop_id"], stops["stop_name"])}
+
+    # O(1) indexes for resolve_stop_input: full row by id, id by lowercased
+    # name (first occurrence wins, matching the old .iloc[0] behaviour), and
+    # child platform ids keyed by parent station.
+    stop_by_id = stops.set_index("stop_id").to_dict("index")
+    stop_id_by_name_lower = {}
+    for _sid, _name in zip(stops["stop_id"], stops["stop_name"]):
+        stop_id_by_name_lower.setdefault(str(_name).lower(), str(_sid))
+    children_by_parent = stops.groupby("parent_station")["stop_id"].apply(list).to_dict()
+    route_mode_lookup = routes.set_index("route_id")["route_type"].to_dict()
+
+    # lowercased route_short_name -> (route_id, route_color); first row wins,
+    # matching the old .iloc[0] pick from the boolean scan
+    route_by_short = {}
+    for _rid, _short, _colour in zip(routes["route_id"], routes["route_short_name"], routes["route_color"]):
+        route_by_short.setdefault(str(_short).strip().lower(), (str(_rid), str(_colour)))
+
+    # (route_id, direction_id) -> trip_id list so /timetable doesn't rescan trips
+    trip_ids_by_route_dir = (
+        trips.groupby(["route_id", "direction_id"], observed=True)["trip_id"]
+        .apply(list).to_dict()
+    )
+
+    # Parallel lowercased-name / id lists for the RapidFuzz matcher
+    stop_names_lower = [str(n).lower() for n in stops["stop_name"]]
+    stop_ids_list = [str(s) for s in stops["stop_id"]]
+
+    trip_time_index = _build_trip_time_index()
+
+    # Precompute route_color -> ANSI code. The service dicts carry route_color
+    # (not route_id), so the LUT is keyed on the colour; the /view row loop
+    # then becomes a dict hit instead of re-running the distance math per row.
+    lut_colours = list({str(info.get("route_color") or "FFFFFF") for info in route_lookup.values()}
+                       | {"FFFFFF", "ffd700", "000000"})
+    route_ansi = dict(zip(lut_colours, nearest_ansi(lut_colours)))
+
+    # Warm track's tables in this same worker thread. Its lazy loader would
+    # otherwise run the full multi-second parse synchronously on the event
+    # loop the first time get_next_services or the status loop touches it.
+    track._ensure_loaded()
+
+# Set the first time on_ready schedules preload_gtfs, so a gateway reconnect
+# can't spawn a second load racing the first over the module globals.
+_gtfs_load_started = False
+
+async def preload_gtfs():
+    """Background task: parse GTFS off the event loop, then unblock commands.
+
+    Retries on failure rather than leaving gtfs_ready unset forever, which
+    would wedge every command behind gtfs_ready.wait().
+    """
+    while not gtfs_ready.is_set():
+        try:
+            await asyncio.to_thread(load_gtfs)
+        except Exception as e:
+            print("preload_gtfs: failed to load GTFS data, retrying in 60s:", e)
+            await asyncio.sleep(60)
+        else:
+            gtfs_ready.set()
+
+# Per-trip arrival index for /timetable: arrival seconds-from-midnight (sorted)
+# plus parallel stop_id / raw time-string arrays. "First departure >= target"
+# then becomes an O(log N) searchsorted per candidate trip instead of
+# recomputing arrival_dt across stop_times on every call.
+def _build_trip_time_index():
+    # to_timedelta parses the whole column in C and handles GTFS >24:00:00
+    # times natively, so no per-row normalisation is needed. assign() keeps
+    # this a shallow projection instead of deep-copying the largest table.
+    st = stop_times[["trip_id", "stop_id", "arrival_time"]].assign(
+        arr_sec=pd.to_timedelta(stop_times["arrival_time"].astype(str), errors="coerce").dt.total_seconds()
+    )
+    st = st.dropna(subset=["arr_sec"])
+    st["arr_sec"] = st["arr_sec"].astype("int32")
+    st = st.sort_values(["trip_id", "arr_sec"])
+    return {
+        tid: (g["arr_sec"].to_numpy(), g["stop_id"].to_numpy(), g["arrival_time"].astype(str).to_numpy())
+        for tid, g in st.groupby("trip_id", sort=False)
+    }
+
+def find_next_trip(trip_ids, target_secs: int):
+    """Return the trip whose earliest stop at/after target_secs is soonest, or None."""
+    best_tid = None
+    best_sec = None
+    for tid in trip_ids:
+        entry = trip_time_index.get(tid)
+        if entry is None:
+            continue
+        arr_secs = entry[0]
+        pos = int(np.searchsorted(arr_secs, target_secs, side="left"))
+        if pos >= len(arr_secs):
+            continue
+        sec = int(arr_secs[pos])
+        if best_sec is None or sec < best_sec:
+            best_tid, best_sec = tid, sec
+    return best_tid
+
+def trip_stops_frame(trip_id):
+    """Materialize the precomputed stop list for one trip, sorted by arrival."""
+    entry = trip_time_index.get(trip_id)
+    if entry is None:
+        return pd.DataFrame(columns=["stop_id", "arrival_time"])
+    return pd.DataFrame({"stop_id": entry[1], "arrival_time": entry[2]})
+
+# GTFS route_type -> display label for the timetable header
+MODE_STR = {
+    0: "<:LightRail:1385977155913256960> Light Rail",
+    1: "<:Metro:1385977091866230888> Metro", # NOTE: This will NOT show for M1, M2, RM1, RM2. As of writing, they are classified as "bus" services. This is just here for future-proofing. Only Apple seems to clasify the services as a different mode. Manual icon change is later in the code (TBD)
+    2: "<:HeavyRail:1385977140448858225> Train",
+    3: "<:Bus:1385976580857135184>  Bus",
+    4: "<:Ferry:1385977117421994024> Ferry"
+}
+
+@functools.lru_cache(maxsize=256)
+def hex_to_discord_color(hex_color):
+    """Converts a hex color string to a discord.Color (green fallback)."""
+    hex_color = hex_color.strip().lstrip("#")
+    if len(hex_color) != 6:
+        return discord.Color.green()
+    b = bytes.fromhex(hex_color)
+    return discord.Color.from_rgb(b[0], b[1], b[2])
+
+def render_trip_rows(trip_stops, route_color):
+    """Build the ANSI stop rows for one trip's precomputed stop list."""
+    if trip_stops.empty:
+        return []
+    ansi_code = ansi_for_colour(route_color)
+    names = trip_stops["stop_id"].astype(str).str.strip().map(stop_name_by_id)
+    names = names.fillna(trip_stops["stop_id"].astype(str).str.strip())
+    names = pd.Series(np.where(names.str.len() > 40, names.str.slice(0, 37) + "...", names), index=names.index)
+    times = trip_stops["arrival_time"].astype(str).str.slice(0, 5)
+    # bold for platforms, italic otherwise — same styling as the old row loop
+    style = np.where(names.str.lower().str.contains("platform", regex=False), "1", "3")
+    rows = ("\x1b[1m" + times + "\x1b[0m — \x1b[" + style + ";" + ansi_code + "m" + names + "\x1b[0m")
+    return rows.tolist()
+
+def next_trip_render(trip_ids, target_time, route_color):
+    """Resolve the next trip after target_time and render its rows.
+
+    Shared by /timetable and the Try Outbound button. Returns
+    (services, first_stop_name, first_arrival) or None when no trip at or
+    after the target time exists.
+    """
+    target_secs = target_time.hour * 3600 + target_time.minute * 60 + target_time.second
+    first_trip_id = find_next_trip(trip_ids, target_secs)
+    if first_trip_id is None:
+        return None
+    trip_stops = trip_stops_frame(first_trip_id)
+    services = render_trip_rows(trip_stops, route_color)
+    first_stop_id = trip_stops.iloc[0]["stop_id"]
+    first_stop_name = stop_name_by_id.get(str(first_stop_id).strip(), str(first_stop_id))
+    return services, first_stop_name, trip_stops.iloc[0]["arrival_time"]
+
+class RetryOutboundView(View):
+    """'Try Outbound' fallback button shown when a route has no inbound trips."""
+
+    def __init__(self, route_id, route_id_actual, route_color, target_time, now):
+        super().__init__(timeout=60)
+        self.route_id = route_id
+        self.route_id_actual = route_id_actual
+        self.route_color = route_color
+        self.target_time = target_time
+        self.now = now
+
+    @discord.ui.button(label="Try Outbound", style=discord.ButtonStyle.danger)
+    async def try_outbound(self, interaction_button: discord.Interaction, button: discord.ui.Button):
+        await interaction_button.response.defer()  # acknowledge interaction
+
+        outbound_trip_ids = trip_ids_by_route_dir.get((self.route_id_actual, 1), [])
+        if not outbound_trip_ids:
+            await interaction_button.followup.send(
+                f"❌ No outbound trips found for route `{self.route_id}` either.",
+                ephemeral=True
+            )
+            return
+
+        rendered = next_trip_render(outbound_trip_ids, self.target_time, self.route_color)
+        if rendered is None:
+            await interaction_button.followup.send(
+                f"❌ No scheduled outbound trips after the current time for route `{self.route_id}`.",
+                ephemeral=True
+            )
+            return
+        services, first_stop_name, first_arrival = rendered
+
+        embed = discord.Embed(
+            title=f"Next trip on Route {self.route_id} (Outbound) - departs {first_stop_name} at {first_arrival}",
+            color=hex_to_discord_color(self.route_color)
+        )
+        embed.description = "```ansi\n" + "\n".join(services[:20]) + "\n```"
+        embed.set_footer(text=f"Last updated: {self.now.strftime('%H:%M:%S')}", icon_url="https://seqta.org/seqta.png")
+
+        await interaction_button.edit_original_response(embed=embed, view=None)
+
+def ansi_for_colour(hex_color: str) -> str:
+    """Return the precomputed ANSI code for a route colour, computing stragglers once."""
+    code = route_ansi.get(hex_color)
+    if code is None:
+        code = closest_ansi_color(hex_color)
+        route_ansi[hex_color] = code
+    return code
 
 # Set up Discord bot intents and command prefix
 intents = discord.Intents.default()
@@ -1077,67 +1403,111 @@ def resolve_stop_input(user_input: str):
         cleaned_user_input = cleaned_user_input[:-8].strip()
     user_input_lower = cleaned_user_input.lower()
 
-    # --- Match Finding ---
+    # --- Match Finding (dict hits instead of full-table scans) ---
+    stop_id = None
     # 1. Exact match for stop_id
-    match = stops[stops["stop_id"] == cleaned_user_input]
+    if cleaned_user_input in stop_by_id:
+        stop_id = cleaned_user_input
     # 2. Exact match for stop_name (case-insensitive)
-    if match.empty:
-        match = stops[stops["stop_name"].str.lower() == user_input_lower]
+    if stop_id is None:
+        stop_id = stop_id_by_name_lower.get(user_input_lower)
     # 3. Fuzzy match for stop_name
-    if match.empty:
-        fuzzy_matches = stops[stops["stop_name"].str.contains(cleaned_user_input, case=False, na=False)]
-        if not fuzzy_matches.empty:
-            # Prefer matches that start with the input, then sort by length
-            fuzzy_matches['startswith'] = fuzzy_matches['stop_name'].str.lower().str.startswith(user_input_lower)
-            fuzzy_matches['length'] = fuzzy_matches['stop_name'].str.len()
-            fuzzy_matches = fuzzy_matches.sort_values(['startswith', 'length'], ascending=[False, True])
-            match = fuzzy_matches.head(1)
-
-    if match.empty:
+    if stop_id is None and rf_process is not None and stop_names_lower:
+        best = rf_process.extractOne(
+            user_input_lower, stop_names_lower,
+            scorer=rf_fuzz.WRatio, score_cutoff=75
+        )
+        if best is not None:
+            stop_id = stop_ids_list[best[2]]
+    if stop_id is None:
+        mask = stops["stop_name"].str.contains(cleaned_user_input, case=False, regex=False, na=False)
+        candidates = stops.loc[mask, ["stop_id", "stop_name"]]
+        if not candidates.empty:
+            # Prefer matches that start with the input, then the shortest name —
+            # a single min() pass instead of two temp columns and a sort
+            best = min(
+                zip(candidates["stop_id"], candidates["stop_name"]),
+                key=lambda sn: (not str(sn[1]).lower().startswith(user_input_lower), len(str(sn[1]))),
+            )
+            stop_id = str(best[0])
+
+    if stop_id is None:
         return None, None, None
 
     # --- Stop Resolution ---
-    stop_info = match.iloc[0]
-    stop_id = stop_info["stop_id"]
-    stop_name = stop_info["stop_name"]
-
-    # Check if the matched stop is a parent station (location_type '1')
-    # Or if it acts as a parent (its ID is in the 'parent_station' column of other stops)
-    # The most reliable way to handle parent stations is to directly look for child stops.
-    child_stops = stops[stops['parent_station'] == stop_id]
-
-    if not child_stops.empty:
-        # This is a parent station. Return the list of its child platform IDs.
-        return stop_name, child_stops['stop_id'].tolist(), True
+    stop_name = stop_by_id[stop_id]["stop_name"]
+
+    # Child platforms were indexed by parent_station at load time; a hit means
+    # the match is a parent station and we return its platform ids.
+    child_ids = children_by_parent.get(stop_id)
+    if child_ids:
+        return stop_name, list(child_ids), True
     else:
         # This is a single platform or a parent with no listed children. Use its own ID.
         return stop_name, [stop_id], False
 
+# Per-user pins cached against the file's mtime so autocomplete doesn't
+# re-read users/<id>_pins.txt on every keystroke.
+_pins_cache = {}
+
+def load_user_pins(user_id: str):
+    """Return a user's pinned stop ids, re-reading the file only when it changes."""
+    filepath = os.path.join("users", f"{user_id}_pins.txt")
+    try:
+        mtime = os.path.getmtime(filepath)
+    except OSError:
+        _pins_cache.pop(user_id, None)
+        return []
+    cached = _pins_cache.get(user_id)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(filepath, "r") as f:
+        pinned_ids = [line.strip() for line in f if line.strip()]
+    _pins_cache[user_id] = (mtime, pinned_ids)
+    return pinned_ids
+
 async def stop_autocomplete(interaction: discord.Interaction, current: str):
     """Provides autocomplete suggestions for stop names, prioritizing pinned stops."""
+    if not gtfs_ready.is_set():
+        await interaction.response.autocomplete([])
+        return
     user_id = str(interaction.user.id)
-    filepath = os.path.join("users", f"{user_id}_pins.txt")
-    pinned_names = []
-
-    # Load pinned stops for the user
-    if os.path.exists(filepath):
-        with open(filepath, "r") as f:
-            pinned_ids = [line.strip() for line in f if line.strip()]
-            for pid in pinned_ids:
-                match = stops[stops["stop_id"] == pid]
-                if not match.empty:
-                    pinned_names.append("⭐ " + match.iloc[0]["stop_name"])
-
-    # Filter stop names based on user's input
-    results = [name for name in stop_names if current.lower() in name.lower() and name not in [n.replace("⭐ ", "") for n in pinned_names]]
-    
-    # Combine pinned stops with other results
-    combined = pinned_names + results
-    combined = combined[:25] # Limit to 25 suggestions
 
-    await interaction.response.autocomplete([
-        app_commands.Choice(name=name, value=name.replace("⭐ ", "")) for name in combined
-    ])
+    # Load pinned stops for the user (dict lookups, no stops scans). Raw names
+    # are kept as-is; the star is only prepended when building the choices, so
+    # nothing needs to strip it back off later.
+    pinned_raw = []
+    for pid in load_user_pins(user_id):
+        name = stop_name_by_id.get(pid)
+        if name is not None:
+            pinned_raw.append(name)
+
+    # Filter stop names based on user's input. The query is lowered once, the
+    # pinned names go in a set, and we stop as soon as 25 suggestions exist
+    # instead of scanning all ~15k names with per-name .lower() calls.
+    q = current.lower()
+    pinned_set = set(pinned_raw)
+    limit = max(0, 25 - len(pinned_raw))
+    results = []
+    if not q:
+        # Empty input: the first unpinned names are as good as any
+        for name in stop_names:
+            if name not in pinned_set:
+                results.append(name)
+                if len(results) >= limit:
+                    break
+    else:
+        for name, name_lower in zip(stop_names, stop_names_lower):
+            if q in name_lower and name not in pinned_set:
+                results.append(name)
+                if len(results) >= limit:
+                    break
+
+    # Combine pinned stops with other results, starring pins for display only
+    choices = [app_commands.Choice(name="⭐ " + name, value=name) for name in pinned_raw]
+    choices += [app_commands.Choice(name=name, value=name) for name in results]
+
+    await interaction.response.autocomplete(choices[:25])
 
 async def pid_mode_autocomplete(interaction: discord.Interaction, current: str):
     """Provides autocomplete suggestions for PID modes."""
@@ -1149,6 +1519,11 @@ async def pid_mode_autocomplete(interaction: discord.Interaction, current: str):
 @bot.event
 async def on_ready():
     """Event handler for when the bot is ready and connected to Discord."""
+    # parse GTFS in a worker thread; commands wait on gtfs_ready
+    global _gtfs_load_started
+    if not _gtfs_load_started:
+        _gtfs_load_started = True
+        bot.loop.create_task(preload_gtfs())
     try:
         synced = await bot.tree.sync()
         print(f"Synced {len(synced)} command(s)")
@@ -1177,25 +1552,32 @@ async def ping(interaction: discord.Interaction):
 @app_commands.autocomplete(stop_name=stop_autocomplete)
 async def pin(interaction: discord.Interaction, stop_name: str):
     """Pins a stop for the user, saving it to a file."""
+    if not gtfs_ready.is_set():
+        await interaction.response.send_message("Still loading timetable data, try again in a moment.", ephemeral=True)
+        return
     user_id = str(interaction.user.id)
-    stop_real_id, stop_real_name = resolve_stop_input(stop_name)
+    stop_real_name, stop_ids, _is_station = resolve_stop_input(stop_name)
 
-    if not stop_real_id:
+    if not stop_ids:
         await interaction.response.send_message("Could not find that stop.", ephemeral=True)
         return
+    stop_real_id = str(stop_ids[0])
 
     directory = "users"
     if not os.path.exists(directory):
         os.makedirs(directory)
 
+    # Duplicate check against the cached pin list, then a plain append —
+    # no re-read of the whole file inside the command.
+    if stop_real_id in load_user_pins(user_id):
+        await interaction.response.send_message(f"Stop '{stop_real_name}' is already pinned.", ephemeral=True)
+        return
+
     filepath = os.path.join(directory, f"{user_id}_pins.txt")
-    with open(filepath, "a+") as f:
-        f.seek(0)
-        if stop_real_id in [line.strip() for line in f]:
-            await interaction.response.send_message(f"Stop '{stop_real_name}' is already pinned.", ephemeral=True)
-        else:
-            f.write(f"{stop_real_id}\n")
-            await interaction.response.send_message(f"Pinned stop: '{stop_real_name}'.", ephemeral=True)
+    with open(filepath, "a") as f:
+        f.write(f"{stop_real_id}\n")
+    _pins_cache.pop(user_id, None)
+    await interaction.response.send_message(f"Pinned stop: '{stop_real_name}'.", ephemeral=True)
 
 @bot.tree.command(name="view", description="View next departures for a stop.")
 @app_commands.autocomplete(stop_name=stop_autocomplete, pid_mode=pid_mode_autocomplete)
@@ -1207,11 +1589,11 @@ async def pin(interaction: discord.Interaction, stop_name: str):
 async def view(interaction: discord.Interaction, stop_name: str, service_count: int = 8, pid_mode: str = "General"):
     """Fetches and displays real-time and scheduled departures for a stop or station."""
     await interaction.response.defer(thinking=True, ephemeral=False)
+    await gtfs_ready.wait()
 
     # Resolve stop name to get a list of stop IDs
     stop_name_input = stop_name
     stop_name, stop_ids, is_station = resolve_stop_input(stop_name_input)
-    print(f"Resolved '{stop_name_input}' to stop_name: '{stop_name}', stop_ids: {stop_ids}, is_station: {is_station}")
     if not stop_ids:
         await interaction.followup.send(f"Could not find stop or station: '{stop_name}'", ephemeral=True)
         return
@@ -1246,86 +1628,73 @@ async def view(interaction: discord.Interaction, stop_name: str, service_count:
     if pid_mode_lower == "general":
         header = f"ID   {'Destination':<27}Time  RT"
         for service in upcoming_services:
-            ansi_code = closest_ansi_color(service.get('route_color', 'FFFFFF'))
-            time_diff_minutes = int((service['eta_time'] - now).total_seconds() // 60)
+            ansi_code = ansi_for_colour(service.route_color)
+            time_diff_minutes = int((service.eta_time - now).total_seconds() // 60)
             eta_diff_str = "Now" if time_diff_minutes < 1 else f"{time_diff_minutes} min"
-            rt_marker = " ●" if service['is_realtime'] else " ○"
+            rt_marker = " ●" if service.is_realtime else " ○"
             
-            plat = service.get('platform', '-')
-            dest = service['destination']
+            plat = service.platform
+            dest = service.destination
             display_dest = f"({plat}) {dest}" if plat != '-' else dest
 
-            colored_dest = f"\x1b[{ansi_code}m{display_dest[:25]:<26}\x1b[0m"
-            route_id_str = f"{service['route_name']:<5}"
-            time_str = f"{eta_diff_str:>6}"
-            rows.append(f"{route_id_str}{colored_dest}{time_str} {rt_marker}")
+            # {:<26.25} truncates and pads in one op (slice + ljust combined)
+            rows.append(f"{service.route_name:<5}\x1b[{ansi_code}m{display_dest:<26.25}\x1b[0m{eta_diff_str:>6} {rt_marker}")
 
     elif pid_mode_lower == "rail":
         header = f"\x1b[33;1m{now.strftime('%I:%M')}\x1b[33;0m          Next services"
         rows.append(f"\x1b[0;37;1m Service{'':<21}Platform  Departs\x1b[0m")
         for service in upcoming_services:
-            ansi_code = closest_ansi_color(service.get('route_color', 'FFFFFF'))
-            eta_time = service['eta_time'].strftime('%H:%M')
-            
-            plat = service.get('platform', '-')
-            dest = service['destination'].replace(' station', '').replace('Station', '')
+            ansi_code = ansi_for_colour(service.route_color)
+            eta_time = service.eta_time.strftime('%H:%M')
             
-            # Truncate and pad the destination string to a fixed width
-            dest_str = f"{dest[:21]:<22}"
-            colored_dest = f"\x1b[{ansi_code}m{dest_str}\x1b[0m"
+            plat = service.platform
+            dest = service.destination.replace(' station', '').replace('Station', '')
 
-            platform_str = f"{plat:^8}"
-            time_diff_minutes = int((service['eta_time'] - now).total_seconds() // 60)
+            time_diff_minutes = int((service.eta_time - now).total_seconds() // 60)
             eta_diff_str = "Now" if time_diff_minutes < 1 else f"{time_diff_minutes} min"
-            rows.append(f" {eta_time:<5} {colored_dest} {platform_str} {eta_diff_str:>6}")
+            rows.append(f" {eta_time:<5} \x1b[{ansi_code}m{dest:<22.21}\x1b[0m {plat:^8} {eta_diff_str:>6}")
 
     elif pid_mode_lower == "bus":
         header = f"Route  Destination{'':<20}Departs"
         for service in upcoming_services:
-            ansi_code = closest_ansi_color(service.get('route_color', 'FFFFFF'))
-            route_name = service['route_name']
+            ansi_code = ansi_for_colour(service.route_color)
+            route_name = service.route_name
             
-            plat = service.get('platform', '-')
-            dest = service['destination']
-            display_dest = dest
+            plat = service.platform
+            dest = service.destination
 
-            colored_dest = f"\x1b[{ansi_code}m{display_dest[:31]:<32}\x1b[0m"
-            time_diff_minutes = int((service['eta_time'] - now).total_seconds() // 60)
+            time_diff_minutes = int((service.eta_time - now).total_seconds() // 60)
             eta_diff_str = "Now" if time_diff_minutes < 1 else f"{time_diff_minutes} min"
-            rows.append(f"{route_name:<6} {colored_dest} {eta_diff_str:>6}")
+            rows.append(f"{route_name:<6} \x1b[{ansi_code}m{dest:<32.31}\x1b[0m {eta_diff_str:>6}")
         rows.append("\x1b[1mVisit translink.com.au or call 13 12 30\x1b[0m")
 
     elif pid_mode_lower == "tram":
         header = f""
         for service in upcoming_services:
-            ansi_code = closest_ansi_color(service.get('route_color', 'ffd700'))
+            ansi_code = ansi_for_colour(service.route_color)
             
-            plat = service.get('platform', '-')
-            dest = service['destination']
+            plat = service.platform
+            dest = service.destination
             display_dest = f"({plat}) {dest}" if plat != '-' else dest
 
-            colored_dest = f"\x1b[{ansi_code}m{display_dest[:28]:<28}\x1b[0m"
-            time_diff_minutes = int((service['eta_time'] - now).total_seconds() // 60)
+            time_diff_minutes = int((service.eta_time - now).total_seconds() // 60)
             eta_diff_str = "Now" if time_diff_minutes < 1 else f"{time_diff_minutes} min"
-            rows.append(f"{colored_dest} {eta_diff_str:>6}")
+            rows.append(f"\x1b[{ansi_code}m{display_dest:<28.28}\x1b[0m {eta_diff_str:>6}")
 
     else: # Fallback to general
         header = f"ID   {'Route':<27}Time  RT"
         for service in upcoming_services:
-            ansi_code = closest_ansi_color(service.get('route_color', 'FFFFFF'))
-            time_diff_minutes = int((service['eta_time'] - now).total_seconds() // 60)
+            ansi_code = ansi_for_colour(service.route_color)
+            time_diff_minutes = int((service.eta_time - now).total_seconds() // 60)
             eta_diff_str = "Now" if time_diff_minutes < 1 else f"{time_diff_minutes} min"
-            rt_marker = " ●" if service['is_realtime'] else " ○"
-            colored_dest = f"\x1b[{ansi_code}m{service['destination'][:25]:<26}\x1b[0m"
-            route_id_str = f"{service['route_name']:<5}"
-            time_str = f"{eta_diff_str:>6}"
-            rows.append(f"{route_id_str}{colored_dest}{time_str} {rt_marker}")
+            rt_marker = " ●" if service.is_realtime else " ○"
+            rows.append(f"{service.route_name:<5}\x1b[{ansi_code}m{service.destination:<26.25}\x1b[0m{eta_diff_str:>6} {rt_marker}")
 
     # Set embed color based on the first service
     embed_color = 0x000000  # Default to black
     if upcoming_services:
         # Get color from the first service, default to black if not present
-        hex_color = upcoming_services[0].get('route_color', '000000')
+        hex_color = upcoming_services[0].route_color
         # discord.py color requires an integer from hex
         embed_color = int(hex_color, 16)
 
@@ -1344,6 +1713,7 @@ async def view(interaction: discord.Interaction, stop_name: str, service_count:
 @app_commands.describe(route_id="Route short name (e.g. 100)", time="Time in 24h format like 15:30", direction="Trip direction (Inbound or Outbound)")
 async def timetable(interaction: discord.Interaction, route_id: str, time: str = None, direction: str = "Inbound"):
     await interaction.response.defer()
+    await gtfs_ready.wait()
     try:
         now = datetime.now()
         target_time = now
@@ -1355,176 +1725,36 @@ async def timetable(interaction: discord.Interaction, route_id: str, time: str =
                 await interaction.followup.send("❌ Invalid time format. Use HH:MM (24-hour).", ephemeral=True)
                 return
 
-        route_matches = routes[routes["route_short_name"].str.strip().str.lower() == route_id.strip().lower()]
-        if route_matches.empty:
+        route_entry = route_by_short.get(route_id.strip().lower())
+        if route_entry is None:
             await interaction.followup.send(f"❌ Route `{route_id}` not found.", ephemeral=True)
             return
-        route = route_matches.iloc[0]
-        route_id_actual = route["route_id"]
-        route_color = route.get("route_color", "00FF00")
+        route_id_actual, route_color = route_entry
+        if not route_color or route_color == "nan":
+            route_color = "00FF00"
 
-        route_mode_lookup = routes.set_index("route_id")["route_type"].to_dict()
         mode_code = route_mode_lookup.get(route_id_actual)
-        mode_str = {
-            0: "<:LightRail:1385977155913256960> Light Rail",
-            1: "<:Metro:1385977091866230888> Metro", # NOTE: This will NOT show for M1, M2, RM1, RM2. As of writing, they are classified as "bus" services. This is just here for future-proofing. Only Apple seems to clasify the services as a different mode. Manual icon change is later in the code (TBD)
-            2: "<:HeavyRail:1385977140448858225> Train",
-            3: "<:Bus:1385976580857135184>  Bus",
-            4: "<:Ferry:1385977117421994024> Ferry"
-        }.get(mode_code, "❓ Unknown Mode")
-
-        # 2. get trips for route
-        trips_for_route = trips[trips["route_id"] == route_id_actual]
+        mode_str = MODE_STR.get(mode_code, "❓ Unknown Mode")
+
+        # 2. get trips for route (indexed by (route_id, direction_id) at load time)
         direction_code = 0 if direction.lower() == "inbound" else 1
-        trips_for_route = trips_for_route[trips_for_route["direction_id"] == direction_code]
-        if trips_for_route.empty:
+        route_trip_ids = trip_ids_by_route_dir.get((route_id_actual, direction_code), [])
+        if not route_trip_ids:
             if direction.lower() == "inbound":
-                class RetryOutboundView(View):
-                    def __init__(self, target_time):
-                        super().__init__(timeout=60)
-                        self.target_time = target_time
-
-                    @discord.ui.button(label="Try Outbound", style=discord.ButtonStyle.danger)
-                    async def try_outbound(self, interaction_button: discord.Interaction, button: discord.ui.Button):
-                        await interaction_button.response.defer()  # acknowledge interaction
-
-                        # fetch outbound trips
-                        outbound_direction_code = 1
-                        outbound_trips = trips[trips["route_id"] == route_id_actual]
-                        outbound_trips = outbound_trips[outbound_trips["direction_id"] == outbound_direction_code]
-
-                        if outbound_trips.empty:
-                            await interaction_button.followup.send(
-                                f"❌ No outbound trips found for route `{route_id}` either.",
-                                ephemeral=True
-                            )
-                            return
-
-                        stop_times_for_outbound = stop_times[stop_times["trip_id"].isin(outbound_trips["trip_id"])].copy()
-
-                        def parse_arrival(time_str):
-                            try:
-                                h, m, s = map(int, time_str.split(":"))
-                                base = now.replace(hour=0, minute=0, second=0, microsecond=0)
-                                delta = timedelta(hours=h, minutes=m, seconds=s)
-                                return base + delta
-                            except:
-                                return None
-
-                        stop_times_for_outbound["arrival_dt"] = stop_times_for_outbound["arrival_time"].apply(parse_arrival)
-                        stop_times_for_outbound = stop_times_for_outbound[stop_times_for_outbound["arrival_dt"].notnull()]
-                        merged_outbound = stop_times_for_outbound.merge(outbound_trips, on="trip_id")
-                        merged_outbound = merged_outbound[merged_outbound["arrival_dt"] >= self.target_time]
-                        if merged_outbound.empty:
-                            await interaction_button.followup.send(
-                                f"❌ No scheduled outbound trips after the current time for route `{route_id}`.",
-                                ephemeral=True
-                            )
-                            return
-
-                        first_trip_id = merged_outbound.sort_values("arrival_dt").iloc[0]["trip_id"]
-                        trip_stops = stop_times[stop_times["trip_id"] == first_trip_id].copy()
-                        trip_stops["arrival_dt"] = trip_stops["arrival_time"].apply(parse_arrival)
-                        trip_stops = trip_stops[trip_stops["arrival_dt"].notnull()].sort_values("arrival_dt")
-
-                        services = []
-                        for _, row in trip_stops.iterrows():
-                            sid = str(row["stop_id"]).strip()
-                            match = stops[stops["stop_id"].astype(str).str.strip() == sid]
-                            stop_name = match["stop_name"].values[0] if not match.empty else sid
-                            if len(stop_name) > 40:
-                                stop_name = stop_name[:37] + "..."
-                            formatted_time = row["arrival_time"][:5]
-                            ansi_code = closest_ansi_color(route_color)
-                            stop_fmt = f"\x1b[3;{ansi_code}m{stop_name}\x1b[0m"
-                            services.append(f"\x1b[1m{formatted_time}\x1b[0m — {stop_fmt}")
-
-                        first_stop_id = trip_stops.iloc[0]["stop_id"]
-                        stop_match = stops[stops["stop_id"].astype(str).str.strip() == str(first_stop_id).strip()]
-                        first_stop_name = stop_match["stop_name"].values[0] if not stop_match.empty else str(first_stop_id)
-
-                        def hex_to_discord_color(hex_color):
-                            hex_color = hex_color.strip().lstrip("#")
-                            if len(hex_color) != 6:
-                                return discord.Color.green()
-                            r = int(hex_color[0:2], 16)
-                            g = int(hex_color[2:4], 16)
-                            b = int(hex_color[4:6], 16)
-                            return discord.Color.from_rgb(r, g, b)
-
-                        embed_color = hex_to_discord_color(route_color)
-
-                        capped_services = services[:20]
-                        embed = discord.Embed(
-                            title=f"Next trip on Route {route_id} (Outbound) - departs {first_stop_name} at {trip_stops.iloc[0]['arrival_time']}",
-                            color=embed_color
-                        )
-                        embed.description = "```ansi\n" + "\n".join(capped_services) + "\n```"
-                        embed.set_footer(text=f"Last updated: {now.strftime('%H:%M:%S')}", icon_url="https://seqta.org/seqta.png")
-
-                        await interaction_button.edit_original_response(embed=embed, view=None)
-
                 await interaction.followup.send(
                     f"❌ No inbound trips found for route `{route_id}`.",
-                    view=RetryOutboundView(target_time),
+                    view=RetryOutboundView(route_id, route_id_actual, route_color, target_time, now),
                     ephemeral=True
                 )
             else:
                 await interaction.followup.send(f"❌ No outbound trips found for route `{route_id}`.", ephemeral=True)
             return
 
-        stop_times_for_trips = stop_times[stop_times["trip_id"].isin(trips_for_route["trip_id"])]
-        stop_times_for_trips = stop_times_for_trips.copy()
-
-        def parse_arrival(time_str):
-            try:
-                h, m, s = map(int, time_str.split(":"))
-                base = now.replace(hour=0, minute=0, second=0, microsecond=0)
-                delta = timedelta(hours=h, minutes=m, seconds=s)
-                return base + delta
-            except:
-                return None
-
-        stop_times_for_trips["arrival_dt"] = stop_times_for_trips["arrival_time"].apply(parse_arrival)
-        stop_times_for_trips = stop_times_for_trips[stop_times_for_trips["arrival_dt"].notnull()]
-
-        merged = stop_times_for_trips.merge(trips_for_route, on="trip_id")
-        merged = merged[merged["arrival_dt"] >= target_time]
-        if merged.empty:
+        rendered = next_trip_render(route_trip_ids, target_time, route_color)
+        if rendered is None:
             await interaction.followup.send("No scheduled trips after that time.", ephemeral=True)
             return
-
-        first_trip_id = merged.sort_values("arrival_dt").iloc[0]["trip_id"]
-        trip_stops = stop_times[stop_times["trip_id"] == first_trip_id].copy()
-        trip_stops["arrival_dt"] = trip_stops["arrival_time"].apply(parse_arrival)
-        trip_stops = trip_stops[trip_stops["arrival_dt"].notnull()].sort_values("arrival_dt")
-
-        services = []
-        for _, row in trip_stops.iterrows():
-            sid = str(row["stop_id"]).strip()
-            match = stops[stops["stop_id"].astype(str).str.strip() == sid]
-            stop_name = match["stop_name"].values[0] if not match.empty else sid
-            if len(stop_name) > 40:
-                stop_name = stop_name[:37] + "..."
-            formatted_time = row['arrival_time'][:5]
-            ansi_code = closest_ansi_color(route_color)
-            if "platform" in stop_name.lower():
-                stop_fmt = f"\x1b[1;{ansi_code}m{stop_name}\x1b[0m"  # bold + route color
-            else:
-                stop_fmt = f"\x1b[3;{ansi_code}m{stop_name}\x1b[0m"  # italic + route color
-            services.append(f"\x1b[1m{formatted_time}\x1b[0m — {stop_fmt}")
-        first_stop_id = trip_stops.iloc[0]["stop_id"]
-        stop_match = stops[stops["stop_id"].astype(str).str.strip() == str(first_stop_id).strip()]
-        first_stop_name = stop_match["stop_name"].values[0] if not stop_match.empty else str(first_stop_id)
-
-        def hex_to_discord_color(hex_color):
-            hex_color = hex_color.strip().lstrip("#")
-            if len(hex_color) != 6:
-                return discord.Color.green()
-            r = int(hex_color[0:2], 16)
-            g = int(hex_color[2:4], 16)
-            b = int(hex_color[4:6], 16)
-            return discord.Color.from_rgb(r, g, b)
+        services, first_stop_name, first_arrival = rendered
 
         embed_color = hex_to_discord_color(route_color)
 
@@ -1532,7 +1762,7 @@ async def timetable(interaction: discord.Interaction, route_id: str, time: str =
         is_truncated = len(services) > 20
 
         embed = discord.Embed(
-            title=f"Next trip on Route {route_id} - departs {first_stop_name} at {trip_stops.iloc[0]['arrival_time']}",
+            title=f"Next trip on Route {route_id} - departs {first_stop_name} at {first_arrival}",
             color=embed_color
         )
         embed.description = (mode_str) + " Timetable\n```ansi\n" + "\n".join(capped_services) + "\n```"
@@ -1568,6 +1798,7 @@ if __name__ == "__main__":
 @bot.tree.command(name="post_status", description="(debug) Immediately post or update the Translink status message in the configured STATUS_CHANNEL_ID.")
 async def post_status(interaction: discord.Interaction):
     await interaction.response.defer(ephemeral=True)
+    await gtfs_ready.wait()
     if not STATUS_CHANNEL_ID:
         await interaction.followup.send("STATUS_CHANNEL_ID is not configured on the bot.", ephemeral=True)
         return
@@ -1,11 +1,39 @@
 import os
 import pandas as pd
+import numpy as np
 import aiohttp
 from datetime import datetime, timezone, timedelta
+
+# Prefer the fast upb protobuf runtime. The choice is made on the first
+# google.protobuf import anywhere in the process, so set it before pulling in
+# the GTFS-RT bindings (bot.py does the same for whichever module loads first).
+os.environ.setdefault("PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION", "upb")
 from google.transit import gtfs_realtime_pb2
 import asyncio
+import heapq
+import time
 import re
 import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from operator import attrgetter
+import logging
+
+# Optional: numba JIT for the hot arrival-time parse; everything works (via
+# pandas' C parser) when it isn't installed.
+try:
+    import numba
+except ImportError:
+    numba = None
+
+logger = logging.getLogger(__name__)
+
+try:
+    from google.protobuf.internal import api_implementation
+    if api_implementation.Type() == "python":
+        logger.warning("protobuf is using the pure-Python runtime; GTFS-RT parsing will be slow")
+except Exception:
+    pass
 
 # --- Config ---
 GTFS_DIR = "SEQ_GTFS"
@@ -14,9 +42,21 @@ GTFS_STATIC_URL = os.getenv("GTFS_STATIC_URL", "")  # URL to the Translink SEQ G
 # Toggle: if true, perform a GTFS static download immediately when the updater starts
 DOWNLOAD_ON_BOOT = os.getenv("DownloadOnBoot", "").strip().lower() in ("true", "1", "yes", "on")
 
-# --- GTFS Data Loading and Auto-Update ---
-print("Loading GTFS data...")
+# Shared HTTP session for the realtime pollers. One connector keeps the
+# Translink TLS connection and DNS entry warm across polls instead of
+# re-handshaking on every call.
+_http_session = None
+
+
+async def _get_session():
+    """Return the shared aiohttp session, creating it lazily on the running loop."""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        connector = aiohttp.TCPConnector(limit=8, ttl_dns_cache=300, keepalive_timeout=60)
+        _http_session = aiohttp.ClientSession(connector=connector)
+    return _http_session
 
+# --- GTFS Data Loading and Auto-Update ---
 # Global GTFS dataframes and lookups; initialised by load_gtfs_data()
 calendar = None
 calendar_dates = None
@@ -28,7 +68,35 @@ trip_lookup = {}
 route_lookup = {}
 route_short_to_ids = {}
 trip_bounds_with_type = None
+# Structure-of-arrays view of trip_bounds_with_type for get_running_trip_counts:
+# parallel int32 start/end seconds and an int8 mode code (2/3/0, -1 = other)
+_tb_start = None
+_tb_end = None
+_tb_code = None
+# Sweep-line table: _tb_running[mode, sec] = trips of that mode active at sec
+# (rows 0/1/2 = train/bus/tram), built once so each query is a single lookup
+_tb_running = None
 trip_to_route_type = {}
+route_type_by_id = {}
+# (route_id, service_id) pairs with at least one trip, for the rail
+# replacement day checks
+route_service_pairs = set()
+stop_times_by_stop = {}
+trips_by_service = {}
+stop_departure_index = {}
+trip_display = {}
+stop_name_by_id = {}
+_stop_meta = {}
+_stop_names_lower = None
+_stop_ids_arr = None
+_stop_names_arr = None
+_gtfs_loaded = False
+
+
+def _ensure_loaded():
+    """Load GTFS data on first use; importing this module does no file IO."""
+    if not _gtfs_loaded:
+        load_gtfs_data()
 
 
 def update_route_short_lookup():
@@ -37,29 +105,179 @@ def update_route_short_lookup():
     route_short_to_ids = {}
     if routes is None:
         return
-    for _, row in routes.iterrows():
-        short = str(row.get("route_short_name", "")).strip()
-        rid = row.get("route_id")
-        if short and rid:
-            route_short_to_ids.setdefault(short, set()).add(rid)
+    try:
+        shorts = routes["route_short_name"].astype(str).str.strip()
+        valid = (shorts != "") & (shorts != "nan") & routes["route_id"].notna()
+        route_short_to_ids = routes.loc[valid].groupby(shorts[valid])["route_id"].agg(set).to_dict()
+    except Exception as e:
+        logger.warning("warning building route_short_to_ids: %s", e)
+        route_short_to_ids = {}
+
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _arrival_seconds_kernel(buf):
+        # buf is an (n, width) uint8 view of fixed-width ASCII "H?H:MM:SS"
+        n, width = buf.shape
+        out = np.empty(n, np.float64)
+        for i in range(n):
+            h = 0
+            j = 0
+            ok = True
+            while j < width and buf[i, j] != 58:  # ':'
+                c = buf[i, j]
+                if c < 48 or c > 57:
+                    ok = False
+                    break
+                h = h * 10 + (c - 48)
+                j += 1
+            if not ok or j == 0 or j + 6 > width:
+                out[i] = np.nan
+                continue
+            m1 = buf[i, j + 1]
+            m2 = buf[i, j + 2]
+            s1 = buf[i, j + 4]
+            s2 = buf[i, j + 5]
+            if buf[i, j + 3] == 58 and 48 <= m1 <= 57 and 48 <= m2 <= 57 and 48 <= s1 <= 57 and 48 <= s2 <= 57:
+                out[i] = h * 3600 + (m1 - 48) * 600 + (m2 - 48) * 60 + (s1 - 48) * 10 + (s2 - 48)
+            else:
+                out[i] = np.nan
+        return out
+else:
+    _arrival_seconds_kernel = None
+
+
+def _arrival_seconds(values):
+    """GTFS HH:MM:SS (hours may exceed 24) -> seconds as float64, NaN when malformed."""
+    ser = pd.Series(values).astype(str)
+    if _arrival_seconds_kernel is not None:
+        try:
+            buf = np.asarray(ser.to_numpy(), dtype='S9').view(np.uint8).reshape(len(ser), -1)
+            return pd.Series(_arrival_seconds_kernel(buf), index=ser.index)
+        except Exception as e:
+            logger.warning("warning in numba arrival parser, using pandas: %s", e)
+    return pd.to_timedelta(ser, errors='coerce').dt.total_seconds()
+
+
+# Columns worth tokenizing per table (calendar files are small and read whole).
+# Mirrors the narrowing in load_gtfs_data so the CSV parser skips the rest.
+_GTFS_USECOLS = {
+    'routes': ['route_id', 'route_short_name', 'route_long_name', 'route_desc', 'route_color', 'route_type'],
+    'stops': ['stop_id', 'stop_name'],
+    'stop_times': ['trip_id', 'arrival_time', 'stop_id'],
+    'trips': ['trip_id', 'route_id', 'service_id', 'trip_headsign'],
+}
+
+
+def _read_gtfs_csv(name):
+    """Read one GTFS table as str, via a parquet cache under GTFS_DIR/.cache.
+
+    The first load converts <name>.txt to a columnar copy; later reloads skip
+    CSV tokenizing (stop_times.txt dominates). The cache file is namespaced
+    with .str so it never collides with bot.py's typed cache of the same
+    table, and any read/write problem just falls back to plain read_csv.
+    """
+    csv_path = os.path.join(GTFS_DIR, name + '.txt')
+    cache_dir = os.path.join(GTFS_DIR, '.cache')
+    cache_path = os.path.join(cache_dir, name + '.str.parquet')
+    sig_path = cache_path + '.sig'
+    # Source signature: mtime alone can go backwards when the daily updater
+    # swaps in a freshly extracted directory, so fold the size in as well.
+    st = os.stat(csv_path)
+    csv_sig = f"{st.st_mtime_ns}:{st.st_size}"
+    try:
+        if os.path.exists(cache_path):
+            with open(sig_path) as f:
+                if f.read().strip() == csv_sig:
+                    return pd.read_parquet(cache_path)
+    except Exception as e:
+        logger.warning(f"warning reading cached {name}.str.parquet, falling back to CSV: %s", e)
+    usecols = _GTFS_USECOLS.get(name)
+    if usecols is not None:
+        # Intersect with the header so an optional column (e.g. route_desc)
+        # missing from a feed doesn't make usecols raise
+        try:
+            header = pd.read_csv(csv_path, nrows=0).columns
+            usecols = [c for c in usecols if c in header]
+        except Exception:
+            usecols = None
+    try:
+        # The multithreaded pyarrow engine parses stop_times several times
+        # faster than the default C engine when pyarrow is installed
+        df = pd.read_csv(csv_path, dtype=str, usecols=usecols, engine='pyarrow')
+    except Exception:
+        df = pd.read_csv(csv_path, dtype=str, usecols=usecols)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        df.to_parquet(cache_path, compression='zstd')
+        with open(sig_path, 'w') as f:
+            f.write(csv_sig)
+    except Exception as e:
+        logger.warning(f"warning writing {name}.str.parquet cache (pyarrow missing?): %s", e)
+    return df
 
 
 def load_gtfs_data():
     """Load or reload GTFS static data into global dataframes and lookups."""
     global calendar, calendar_dates, routes, stop_times, stops, trips
-    global trip_lookup, route_lookup, trip_to_route_type
-
+    global trip_lookup, route_lookup, trip_to_route_type, route_type_by_id
+    global route_service_pairs
+    global stop_times_by_stop, trips_by_service
+    global stop_departure_index, trip_display, stop_name_by_id, _stop_meta
+    global _stop_names_lower, _stop_ids_arr, _stop_names_arr, _gtfs_loaded
+
+    # Parse the tables in parallel: pandas releases the GIL for most of the
+    # read, so the small tables load in stop_times' shadow
     try:
-        cal = pd.read_csv(os.path.join(GTFS_DIR, 'calendar.txt'), dtype=str)
-        cal_dates = pd.read_csv(os.path.join(GTFS_DIR, 'calendar_dates.txt'), dtype=str)
-        rts = pd.read_csv(os.path.join(GTFS_DIR, 'routes.txt'), dtype=str)
-        st_times = pd.read_csv(os.path.join(GTFS_DIR, 'stop_times.txt'), dtype=str)
-        sts = pd.read_csv(os.path.join(GTFS_DIR, 'stops.txt'), dtype=str)
-        trps = pd.read_csv(os.path.join(GTFS_DIR, 'trips.txt'), dtype=str)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            cal, cal_dates, rts, st_times, sts, trps = pool.map(
+                _read_gtfs_csv,
+                ['calendar', 'calendar_dates', 'routes', 'stop_times', 'stops', 'trips'],
+            )
     except Exception as e:
-        print("error loading GTFS static data:", e)
+        logger.warning("error loading GTFS static data: %s", e)
         return
 
+    # Keep only the columns track actually reads — shapes, coordinates and
+    # URL columns just inflate memory and widen every later merge.
+    # route_long_name/route_desc/route_type stay for railbus detection.
+    _keep = {
+        'routes': ['route_id', 'route_short_name', 'route_long_name', 'route_desc', 'route_color', 'route_type'],
+        'stops': ['stop_id', 'stop_name'],
+        'stop_times': ['trip_id', 'arrival_time', 'stop_id'],
+        'trips': ['trip_id', 'route_id', 'service_id', 'trip_headsign'],
+    }
+    try:
+        rts = rts[[c for c in _keep['routes'] if c in rts.columns]]
+        sts = sts[[c for c in _keep['stops'] if c in sts.columns]]
+        st_times = st_times[[c for c in _keep['stop_times'] if c in st_times.columns]]
+        trps = trps[[c for c in _keep['trips'] if c in trps.columns]]
+    except Exception as e:
+        logger.warning("warning narrowing GTFS columns: %s", e)
+
+    # Denormalise the display columns onto trips so the per-request departure
+    # path never has to merge routes again
+    try:
+        trps = trps.merge(rts[['route_id', 'route_short_name', 'route_color']], on='route_id', how='left')
+    except Exception as e:
+        logger.warning("warning denormalising route columns onto trips: %s", e)
+
+    # Shared categorical join keys: both sides of each merge get one category
+    # index, so joins and isin masks compare integer codes instead of hashing
+    # strings. Categories are unioned in case either side has extra ids.
+    try:
+        trip_dtype = pd.CategoricalDtype(pd.unique(pd.concat([trps['trip_id'], st_times['trip_id']])))
+        trps['trip_id'] = trps['trip_id'].astype(trip_dtype)
+        st_times['trip_id'] = st_times['trip_id'].astype(trip_dtype)
+        stop_dtype = pd.CategoricalDtype(pd.unique(pd.concat([sts['stop_id'], st_times['stop_id']])))
+        sts['stop_id'] = sts['stop_id'].astype(stop_dtype)
+        st_times['stop_id'] = st_times['stop_id'].astype(stop_dtype)
+        # service_id only ever feeds isin-style day filters, so a plain
+        # categorical is enough for _isin_codes to compare integer codes
+        trps['service_id'] = trps['service_id'].astype('category')
+    except Exception as e:
+        logger.warning("warning building categorical join keys: %s", e)
+
     # Swap into globals only after everything loads successfully
     calendar = cal
     calendar_dates = cal_dates
@@ -70,7 +288,7 @@ def load_gtfs_data():
 
     # Create lookups for faster access
     try:
-        trip_lookup = trips.set_index('trip_id')['trip_headsign'].to_dict()
+        trip_lookup = dict(zip(trips['trip_id'], trips['trip_headsign']))
     except Exception:
         trip_lookup = {}
     try:
@@ -79,15 +297,101 @@ def load_gtfs_data():
         route_lookup = {}
     try:
         merged = trps.merge(rts[["route_id", "route_type"]], on="route_id", how="left")
-        trip_to_route_type = merged.set_index("trip_id")["route_type"].astype(str).to_dict()
+        trip_to_route_type = dict(zip(merged["trip_id"], merged["route_type"].astype(str)))
     except Exception:
         trip_to_route_type = {}
+    try:
+        route_type_by_id = {
+            str(rid).strip(): str(rtype).strip()
+            for rid, rtype in zip(rts["route_id"], rts["route_type"])
+            if str(rid).strip() and str(rtype).strip()
+        }
+    except Exception:
+        route_type_by_id = {}
+    try:
+        route_service_pairs = set(zip(trps['route_id'], trps['service_id']))
+    except Exception as e:
+        logger.warning("warning building route/service pair set: %s", e)
+        route_service_pairs = set()
+    # Positional row indexes so per-request filters become dict lookups
+    # instead of isin() scans over the full tables
+    try:
+        stop_times_by_stop = st_times.groupby('stop_id').indices
+    except Exception:
+        stop_times_by_stop = {}
+    try:
+        trips_by_service = trps.groupby('service_id', observed=True).indices
+    except Exception:
+        trips_by_service = {}
+    # Per-stop presorted departures: for each stop an arrival-seconds array
+    # (sorted ascending, GTFS >24h values kept as-is) plus the parallel trip
+    # ids. get_scheduled_departures then does one searchsorted per stop
+    # instead of filtering/merging the full stop_times table.
+    try:
+        _arr_sec = _arrival_seconds(st_times['arrival_time'])
+        _dep = pd.DataFrame({
+            'stop_id': st_times['stop_id'].astype(str),
+            'trip_id': st_times['trip_id'].astype(str),
+            'arr_sec': _arr_sec,
+        }).dropna(subset=['arr_sec']).sort_values('arr_sec')
+        stop_departure_index = {
+            sid: (g['arr_sec'].to_numpy(), g['trip_id'].to_numpy())
+            for sid, g in _dep.groupby('stop_id', sort=False)
+        }
+    except Exception as e:
+        logger.warning("warning building stop departure index: %s", e)
+        stop_departure_index = {}
+    # Per-trip display tuple: (service_id, headsign, route_short_name, route_color)
+    try:
+        trip_display = dict(zip(
+            trps['trip_id'].astype(str),
+            zip(trps['service_id'], trps['trip_headsign'],
+                trps['route_short_name'], trps['route_color']),
+        ))
+    except Exception as e:
+        logger.warning("warning building trip display lookup: %s", e)
+        trip_display = {}
+    try:
+        stop_name_by_id = dict(zip(sts['stop_id'].astype(str), sts['stop_name']))
+    except Exception:
+        stop_name_by_id = {}
+    # Per-stop (stop_name, platform) pairs: both depend only on the stop, so
+    # join them into the departure index here rather than per request
+    try:
+        _stop_meta = dict(zip(
+            sts['stop_id'].astype(str),
+            zip(sts['stop_name'], _platform_series(sts['stop_name'])),
+        ))
+    except Exception as e:
+        logger.warning("warning building stop metadata lookup: %s", e)
+        _stop_meta = {}
 
+    # Lowercased stop-name array so resolve_stop_input can stop at the first hit
+    try:
+        _stop_names_arr = sts['stop_name'].astype(str).to_numpy()
+        _stop_ids_arr = sts['stop_id'].astype(str).to_numpy()
+        _stop_names_lower = np.char.lower(_stop_names_arr.astype(str))
+    except Exception:
+        _stop_names_lower = _stop_ids_arr = _stop_names_arr = None
+
+    _service_ids_cache.clear()
+    _resolve_cache.clear()
     update_route_short_lookup()
     build_trip_time_bounds()
-    print("GTFS data loaded/reloaded.")
+    _gtfs_loaded = True
+    # Pre-warm the service-id cache for the dates queries actually hit:
+    # yesterday (overnight trips), today, and a short lookahead, so the first
+    # requests after a reload skip the calendar scan
+    try:
+        today = datetime.now().astimezone().date()
+        for offset in range(-1, 3):
+            get_service_ids_for_day(today + timedelta(days=offset))
+    except Exception as e:
+        logger.warning("warning pre-warming service-id cache: %s", e)
+    logger.info("GTFS data loaded/reloaded.")
 def get_routes_operating_today(date_obj=None):
     """Return the number of distinct routes that have at least one trip operating on the given date."""
+    _ensure_loaded()
     if date_obj is None:
         date_obj = datetime.now().astimezone().date()
 
@@ -97,19 +401,22 @@ def get_routes_operating_today(date_obj=None):
     try:
         service_ids = get_service_ids_for_day(date_obj)
     except Exception as e:
-        print("warning computing routes operating today (service_ids):", e)
+        logger.warning("warning computing routes operating today (service_ids): %s", e)
         return 0
 
     if not service_ids:
         return 0
 
     try:
-        trips_today = trips[trips['service_id'].isin(service_ids)]
+        trips_today = trips[_isin_codes(trips['service_id'], service_ids)]
         return int(trips_today['route_id'].nunique())
     except Exception as e:
-        print("warning computing routes operating today (trips_today):", e)
+        logger.warning("warning computing routes operating today (trips_today): %s", e)
         return 0
 
+# Reusable VehiclePositions message for get_rtt_vehicle_counts (cleared before each parse)
+_vehicle_positions_feed = gtfs_realtime_pb2.FeedMessage()
+
 async def get_rtt_vehicle_counts():
     """Return counts of active vehicles reporting RTT right now by mode using the VehiclePositions feed.
 
@@ -119,62 +426,60 @@ async def get_rtt_vehicle_counts():
     We primarily determine route_type from the trip's route_id as provided in the
     VehiclePositions feed, falling back to a trip_id -> route_type map if needed.
     """
+    _ensure_loaded()
     counts = {"trains": 0, "buses": 0, "trams": 0}
     url = "https://gtfsrt.api.translink.com.au/api/realtime/SEQ/VehiclePositions"
-    feed = gtfs_realtime_pb2.FeedMessage()
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=15) as resp:
-                if resp.status != 200:
-                    print(f"get_rtt_vehicle_counts: HTTP {resp.status} from VehiclePositions")
-                    return counts
-                data = await resp.read()
-                feed.ParseFromString(data)
+        session = await _get_session()
+        async with session.get(url, timeout=15) as resp:
+            if resp.status != 200:
+                logger.warning(f"get_rtt_vehicle_counts: HTTP {resp.status} from VehiclePositions")
+                return counts
+            data = await resp.read()
     except Exception as e:
-        print("get_rtt_vehicle_counts: could not fetch/parse VehiclePositions:", e)
+        logger.warning("get_rtt_vehicle_counts: could not fetch VehiclePositions: %s", e)
         return counts
 
-    global trip_to_route_type
-    local_map = trip_to_route_type
-
-    # If the cached trip->route_type map is empty, build a quick one on the fly
-    if not local_map and trips is not None and routes is not None:
-        try:
-            merged = trips.merge(routes[["route_id", "route_type"]], on="route_id", how="left")
-            local_map = merged.set_index("trip_id")["route_type"].astype(str).to_dict()
-        except Exception as e:
-            print("get_rtt_vehicle_counts: failed to build trip->route_type map on the fly:", e)
-            local_map = {}
+    # Clear, parse and count in one synchronous section: overlapping calls
+    # (status loop plus /post_status) can interleave at the awaits above, so
+    # the shared message must not be touched until the last of them is past.
+    feed = _vehicle_positions_feed
+    try:
+        feed.Clear()
+        feed.ParseFromString(data)
+    except Exception as e:
+        logger.warning("get_rtt_vehicle_counts: could not parse VehiclePositions: %s", e)
+        return counts
 
-    # Pre-build a fast route_id -> route_type lookup from the routes dataframe
-    route_type_by_id = {}
-    if routes is not None:
-        try:
-            for _, row in routes.iterrows():
-                rid = str(row.get("route_id", "")).strip()
-                if not rid:
-                    continue
-                rtype = str(row.get("route_type", "")).strip()
-                if rtype:
-                    route_type_by_id[rid] = rtype
-        except Exception as e:
-            print("get_rtt_vehicle_counts: failed to build route_id->route_type map:", e)
+    # Both lookups are built once in load_gtfs_data; bind them locally so the
+    # entity loop below avoids repeated global loads
+    local_map = trip_to_route_type
+    type_by_route = route_type_by_id
 
-    seen_train = set()
-    seen_bus = set()
-    seen_tram = set()
+    # Per-mode dedup: numeric vehicle ids (the overwhelming majority) flip a
+    # bit in a bytearray bitset, anything else falls back to a set. The
+    # bitsets cost 3 x 128 KiB per poll, which is one cheap memset.
+    bitset_limit = 1 << 20
+    bitsets = [bytearray(bitset_limit >> 3) for _ in range(3)]
+    fallbacks = [set(), set(), set()]
+    mode_counts = [0, 0, 0]
+    mode_index = {"2": 0, "3": 1, "0": 2}
 
     for entity in feed.entity:
         if not entity.HasField("vehicle"):
             continue
 
+        # Hoist the chained protobuf sub-message lookups; each dotted access
+        # goes through a descriptor, which adds up across thousands of entities
         vp = entity.vehicle
-        tid = vp.trip.trip_id
-        rid = vp.trip.route_id
+        trip = vp.trip
+        veh = vp.vehicle
+        tid = trip.trip_id
+        rid = trip.route_id
 
         # choose a stable vehicle key so one vehicle is counted once
-        vid = vp.vehicle.id or vp.vehicle.label or tid or rid
+        vid = veh.id or veh.label or tid or rid
         if not vid:
             continue
 
@@ -183,7 +488,7 @@ async def get_rtt_vehicle_counts():
         # 1) Prefer route_type via route_id from the feed (more robust than trip_id)
         if rid:
             rid_str = str(rid).strip()
-            rtype = route_type_by_id.get(rid_str)
+            rtype = type_by_route.get(rid_str)
 
         # 2) Fall back to trip_id -> route_type mapping if needed
         if not rtype and tid and local_map:
@@ -192,47 +497,80 @@ async def get_rtt_vehicle_counts():
         if not rtype:
             continue
 
-        if rtype == "2":
-            seen_train.add(vid)
-        elif rtype == "3":
-            seen_bus.add(vid)
-        elif rtype == "0":
-            seen_tram.add(vid)
+        mode = mode_index.get(rtype)
+        if mode is None:
+            continue
 
-    counts["trains"] = len(seen_train)
-    counts["buses"] = len(seen_bus)
-    counts["trams"] = len(seen_tram)
+        try:
+            n = int(vid)
+        except ValueError:
+            n = -1
+        if 0 <= n < bitset_limit:
+            bits = bitsets[mode]
+            byte, bit = n >> 3, 1 << (n & 7)
+            if not bits[byte] & bit:
+                bits[byte] |= bit
+                mode_counts[mode] += 1
+        else:
+            seen = fallbacks[mode]
+            if vid not in seen:
+                seen.add(vid)
+                mode_counts[mode] += 1
+
+    counts["trains"] = mode_counts[0]
+    counts["buses"] = mode_counts[1]
+    counts["trams"] = mode_counts[2]
     return counts
 
 
 def build_trip_time_bounds():
     """Precompute per-trip start/end seconds from midnight and attach route_type for stats."""
-    global trip_bounds_with_type
+    global trip_bounds_with_type, _tb_start, _tb_end, _tb_code, _tb_running
     if stop_times is None or trips is None or routes is None:
         trip_bounds_with_type = None
+        _tb_start = _tb_end = _tb_code = _tb_running = None
         return
 
-    def _time_to_seconds(time_str):
-        try:
-            h, m, s = map(int, str(time_str).split(":"))
-            return h * 3600 + m * 60 + s
-        except Exception:
-            return None
-
     try:
-        st = stop_times.copy()
-        st["arr_sec"] = st["arrival_time"].apply(_time_to_seconds)
-        tb = st.groupby("trip_id")["arr_sec"].agg(["min", "max"]).reset_index()
+        arr_sec = _arrival_seconds(stop_times["arrival_time"])
+        tb = (
+            stop_times.assign(arr_sec=arr_sec)
+            .groupby("trip_id", observed=True)["arr_sec"]
+            .agg(["min", "max"])
+            .reset_index()
+        )
         tb = tb.rename(columns={"min": "start_sec", "max": "end_sec"})
+        tb = tb.dropna(subset=["start_sec", "end_sec"])
+        tb["start_sec"] = tb["start_sec"].astype("int32")
+        tb["end_sec"] = tb["end_sec"].astype("int32")
         tb = tb.merge(trips[["trip_id", "route_id"]], on="trip_id", how="left")
         tb = tb.merge(routes[["route_id", "route_type"]], on="route_id", how="left")
         trip_bounds_with_type = tb
+        _tb_start = tb["start_sec"].to_numpy()
+        _tb_end = tb["end_sec"].to_numpy()
+        rt = tb["route_type"].astype(str).to_numpy()
+        code = np.full(len(rt), -1, dtype=np.int8)
+        code[rt == "2"] = 2
+        code[rt == "3"] = 3
+        code[rt == "0"] = 0
+        _tb_code = code
+        # Sweep line over the day: +1 at each trip start, -1 after its end,
+        # then a cumulative sum gives the active count at every second.
+        # Queries only ever ask about 0..86399; trips running past midnight
+        # simply keep their +1 (their end is clipped off the table).
+        size = 86400
+        running = np.zeros((3, size + 1), dtype=np.int32)
+        for row, mode in ((0, 2), (1, 3), (2, 0)):
+            sel = (code == mode) & (_tb_start < size)
+            starts = _tb_start[sel]
+            ends = np.minimum(_tb_end[sel] + 1, size)
+            np.add.at(running[row], starts, 1)
+            np.add.at(running[row], ends, -1)
+        _tb_running = np.cumsum(running[:, :size], axis=1)
     except Exception as e:
-        print("warning building trip time bounds:", e)
+        logger.warning("warning building trip time bounds: %s", e)
         trip_bounds_with_type = None
-
-# Initial load at import time
-load_gtfs_data()
+        _tb_start = _tb_end = _tb_code = _tb_running = None
 
 # --- Extra statistics helpers for bot.py ---
 def get_running_trip_counts(now_local=None):
@@ -241,6 +579,7 @@ def get_running_trip_counts(now_local=None):
     Uses precomputed trip_bounds_with_type and GTFS route_type values:
     2 = rail, 3 = bus, 0 = tram/light rail (all stored as strings).
     """
+    _ensure_loaded()
     from datetime import datetime as _dt
 
     if now_local is None:
@@ -250,30 +589,23 @@ def get_running_trip_counts(now_local=None):
     buses_running = 0
     trams_running = 0
 
-    global trip_bounds_with_type
-    if trip_bounds_with_type is None:
+    if _tb_running is None:
         return trains_running, buses_running, trams_running
 
     try:
         now_sec = now_local.hour * 3600 + now_local.minute * 60 + now_local.second
-        active = trip_bounds_with_type[
-            trip_bounds_with_type["start_sec"].notnull()
-            & trip_bounds_with_type["end_sec"].notnull()
-            & (trip_bounds_with_type["start_sec"] <= now_sec)
-            & (trip_bounds_with_type["end_sec"] >= now_sec)
-        ]
-        # route_type is loaded as string in load_gtfs_data (dtype=str)
-        trains_running = int((active["route_type"] == '2').sum())
-        buses_running = int((active["route_type"] == '3').sum())
-        trams_running = int((active["route_type"] == '0').sum())
+        trains_running = int(_tb_running[0, now_sec])
+        buses_running = int(_tb_running[1, now_sec])
+        trams_running = int(_tb_running[2, now_sec])
     except Exception as e:
-        print("warning computing running trip counts:", e)
+        logger.warning("warning computing running trip counts: %s", e)
 
     return trains_running, buses_running, trams_running
 
 
 def get_route_counts_by_mode():
     """Return a dict with total route counts by mode (rail/bus/tram)."""
+    _ensure_loaded()
     counts = {"rail_routes": 0, "bus_routes": 0, "tram_routes": 0}
     if routes is None:
         return counts
@@ -283,7 +615,7 @@ def get_route_counts_by_mode():
         counts["bus_routes"] = int((rt == '3').sum())
         counts["tram_routes"] = int((rt == '0').sum())
     except Exception as e:
-        print("warning computing route counts by mode:", e)
+        logger.warning("warning computing route counts by mode: %s", e)
     return counts
 
 
@@ -296,42 +628,124 @@ def count_alerts_today(alerts, now_local=None):
 
     if now_local is None:
         now_local = _dt.now().astimezone()
-    today = now_local.date()
+    # Today's local window as epoch seconds, so the loop compares the feed's
+    # raw integer timestamps directly instead of building datetime objects
+    # per active_period. "starts on or before today" is start < day_end and
+    # "ends on or after today" is end >= day_start.
+    day_start = now_local.replace(hour=0, minute=0, second=0, microsecond=0)
+    day_start_ts = day_start.timestamp()
+    day_end_ts = (day_start + timedelta(days=1)).timestamp()
 
     total = 0
     for alert in alerts:
         used = False
         try:
-            if getattr(alert, "active_period", None):
-                for ap in alert.active_period:
-                    start_dt = _dt.fromtimestamp(ap.start, timezone.utc).astimezone() if ap.start else None
-                    end_dt = _dt.fromtimestamp(ap.end, timezone.utc).astimezone() if ap.end else None
-                    if start_dt and end_dt:
-                        if start_dt.date() <= today <= end_dt.date():
-                            used = True
-                            break
-                    elif start_dt:
-                        if start_dt.date() <= today:
-                            used = True
-                            break
-                    elif end_dt:
-                        if today <= end_dt.date():
-                            used = True
-                            break
+            for ap in alert.active_period:
+                start = ap.start
+                end = ap.end
+                if start and end:
+                    if start < day_end_ts and end >= day_start_ts:
+                        used = True
+                        break
+                elif start:
+                    if start < day_end_ts:
+                        used = True
+                        break
+                elif end:
+                    if end >= day_start_ts:
+                        used = True
+                        break
         except Exception:
             pass
         if used:
             total += 1
     return total
 
-# Rail replacement configuration (railbus routes) loaded from JSON
+# Reusable TripUpdates message for get_next_services (cleared before each parse)
+_trip_updates_feed = gtfs_realtime_pb2.FeedMessage()
+
+# Parsed TripUpdates shared across calls: {(trip_id, stop_id): arrival_ts}.
+# Translink refreshes the feed well below this rate, so a short TTL lets a
+# burst of commands reuse one download and one parse.
+_TRIP_UPDATES_TTL = 10.0
+_trip_updates_lock = None
+_trip_updates_map = {}
+_trip_updates_fetched_at = float('-inf')
+_trip_updates_etag = None
+
+
+async def _get_trip_updates_map():
+    """Return the current {(trip_id, stop_id): arrival_ts} TripUpdates map.
+
+    Results are cached for _TRIP_UPDATES_TTL seconds; a lock keeps one fetch
+    in flight at a time, and an If-None-Match conditional GET turns an
+    unchanged feed into a 304 instead of a multi-MB body.
+    """
+    global _trip_updates_lock, _trip_updates_map, _trip_updates_fetched_at, _trip_updates_etag
+    if time.monotonic() - _trip_updates_fetched_at < _TRIP_UPDATES_TTL:
+        return _trip_updates_map
+    if _trip_updates_lock is None:
+        _trip_updates_lock = asyncio.Lock()
+    async with _trip_updates_lock:
+        # A concurrent caller may have refreshed while we waited on the lock
+        if time.monotonic() - _trip_updates_fetched_at < _TRIP_UPDATES_TTL:
+            return _trip_updates_map
+        url = "https://gtfsrt.api.translink.com.au/api/realtime/SEQ/TripUpdates"
+        headers = {"Accept-Encoding": "gzip"}
+        if _trip_updates_etag:
+            headers["If-None-Match"] = _trip_updates_etag
+        feed = _trip_updates_feed
+        try:
+            session = await _get_session()
+            async with session.get(url, timeout=10, headers=headers) as resp:
+                if resp.status == 304:
+                    # Feed unchanged upstream; keep serving the parsed map
+                    _trip_updates_fetched_at = time.monotonic()
+                    return _trip_updates_map
+                if resp.status != 200:
+                    logger.warning(f"Failed to fetch real-time data. Status: {resp.status}")
+                    return _trip_updates_map
+                # Stream the multi-MB feed into one growing buffer instead of
+                # letting read() allocate intermediate bytes objects.
+                buf = bytearray()
+                async for chunk in resp.content.iter_chunked(1 << 16):
+                    buf.extend(chunk)
+                feed.Clear()
+                feed.ParseFromString(bytes(buf))
+                _trip_updates_etag = resp.headers.get("ETag")
+        except Exception as e:
+            logger.warning(f"Could not fetch or parse real-time data: {e}")
+            return _trip_updates_map
+        updates = {}
+        for entity in feed.entity:
+            if not entity.HasField('trip_update'):
+                continue
+            tu = entity.trip_update
+            trip_id = tu.trip.trip_id
+            for stu in tu.stop_time_update:
+                arrival_ts = stu.arrival.time if stu.HasField('arrival') else stu.departure.time
+                if arrival_ts:
+                    updates[(trip_id, stu.stop_id)] = arrival_ts
+        _trip_updates_map = updates
+        _trip_updates_fetched_at = time.monotonic()
+        return _trip_updates_map
+
+# Rail replacement configuration (railbus routes), loaded from JSON on first use
 RAIL_REPLACEMENTS_CONFIG_PATH = "railreplacements.json"
-try:
-    with open(RAIL_REPLACEMENTS_CONFIG_PATH, "r") as f:
-        railrepl_config = json.load(f)
-except Exception as e:
-    print("warning: could not load railreplacements.json:", e)
-    railrepl_config = {}
+_railrepl_config = None
+
+
+def _get_railrepl_config():
+    """Load railreplacements.json lazily; a missing file just disables the feature."""
+    global _railrepl_config
+    if _railrepl_config is None:
+        try:
+            with open(RAIL_REPLACEMENTS_CONFIG_PATH, "r") as f:
+                _railrepl_config = json.load(f)
+        except Exception as e:
+            logger.warning("could not load railreplacements.json: %s", e)
+            _railrepl_config = {}
+    return _railrepl_config
 
 
 async def auto_update_gtfs_daily():
@@ -341,53 +755,65 @@ async def auto_update_gtfs_daily():
     via: `bot.loop.create_task(track.auto_update_gtfs_daily())`.
     """
     if not GTFS_STATIC_URL:
-        print("auto_update_gtfs_daily: GTFS_STATIC_URL not set; skipping automatic updates.")
+        logger.info("auto_update_gtfs_daily: GTFS_STATIC_URL not set; skipping automatic updates.")
         return
 
     async def _do_update(reason: str):
-        print(f"auto_update_gtfs_daily: starting GTFS static update ({reason})...")
+        logger.info(f"auto_update_gtfs_daily: starting GTFS static update ({reason})...")
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(GTFS_STATIC_URL, timeout=120) as resp:
-                    if resp.status != 200:
-                        print(f"auto_update_gtfs_daily: HTTP {resp.status} when fetching GTFS static; keeping existing data.")
-                        return
-
-                    data = await resp.read()
-                    tmp_dir = GTFS_DIR + "_new"
-                    if os.path.exists(tmp_dir):
-                        try:
-                            # remove previous temp dir
-                            import shutil
-                            shutil.rmtree(tmp_dir)
-                        except Exception as e:
-                            print("auto_update_gtfs_daily: failed to remove old temp dir:", e)
-                    os.makedirs(tmp_dir, exist_ok=True)
-
-                    import zipfile
-                    from io import BytesIO
-                    try:
-                        with zipfile.ZipFile(BytesIO(data)) as zf:
-                            zf.extractall(tmp_dir)
-                    except Exception as e:
-                        print("auto_update_gtfs_daily: failed to extract GTFS zip:", e)
-                        return
+            session = await _get_session()
+            async with session.get(GTFS_STATIC_URL, timeout=120) as resp:
+                if resp.status != 200:
+                    logger.warning(f"auto_update_gtfs_daily: HTTP {resp.status} when fetching GTFS static; keeping existing data.")
+                    return
 
-                    # Swap directories atomically where possible
-                    backup_dir = GTFS_DIR + "_old"
+                data = await resp.read()
+                tmp_dir = GTFS_DIR + "_new"
+                if os.path.exists(tmp_dir):
                     try:
-                        if os.path.exists(backup_dir):
-                            import shutil
-                            shutil.rmtree(backup_dir)
-                        if os.path.exists(GTFS_DIR):
-                            os.rename(GTFS_DIR, backup_dir)
-                        os.rename(tmp_dir, GTFS_DIR)
-                        print("auto_update_gtfs_daily: GTFS directory swapped; reloading dataframes...")
-                        load_gtfs_data()
+                        # remove previous temp dir
+                        import shutil
+                        shutil.rmtree(tmp_dir)
                     except Exception as e:
-                        print("auto_update_gtfs_daily: failed to swap GTFS directories:", e)
+                        logger.warning("auto_update_gtfs_daily: failed to remove old temp dir: %s", e)
+                os.makedirs(tmp_dir, exist_ok=True)
+
+                import zipfile
+                from io import BytesIO
+                # Only extract the tables we actually load; the Translink zip
+                # also carries shapes.txt, which dwarfs everything else and is
+                # never read
+                wanted = ('calendar.txt', 'calendar_dates.txt', 'routes.txt',
+                          'stops.txt', 'stop_times.txt', 'trips.txt')
+                try:
+                    with zipfile.ZipFile(BytesIO(data)) as zf:
+                        names = set(zf.namelist())
+                        missing = [n for n in wanted if n not in names]
+                        if missing:
+                            logger.warning(f"auto_update_gtfs_daily: GTFS zip missing {missing}; keeping existing data.")
+                            return
+                        for name in wanted:
+                            zf.extract(name, tmp_dir)
+                except Exception as e:
+                    logger.warning("auto_update_gtfs_daily: failed to extract GTFS zip: %s", e)
+                    return
+
+                # Swap directories atomically where possible; os.replace is a
+                # single atomic rename on the same filesystem
+                backup_dir = GTFS_DIR + "_old"
+                try:
+                    if os.path.exists(backup_dir):
+                        import shutil
+                        shutil.rmtree(backup_dir)
+                    if os.path.exists(GTFS_DIR):
+                        os.replace(GTFS_DIR, backup_dir)
+                    os.replace(tmp_dir, GTFS_DIR)
+                    logger.info("auto_update_gtfs_daily: GTFS directory swapped; reloading dataframes...")
+                    load_gtfs_data()
+                except Exception as e:
+                    logger.warning("auto_update_gtfs_daily: failed to swap GTFS directories: %s", e)
         except Exception as e:
-            print("auto_update_gtfs_daily: error during update:", e)
+            logger.warning("auto_update_gtfs_daily: error during update: %s", e)
 
     first_run = True
     while True:
@@ -401,23 +827,53 @@ async def auto_update_gtfs_daily():
         tomorrow = (now + timedelta(days=1)).date()
         next_midnight = datetime.combine(tomorrow, datetime.min.time(), tzinfo=now.tzinfo)
         sleep_seconds = max(10, (next_midnight - now).total_seconds())
-        print(f"auto_update_gtfs_daily: sleeping {int(sleep_seconds)}s until {next_midnight.isoformat()}")
+        logger.info(f"auto_update_gtfs_daily: sleeping {int(sleep_seconds)}s until {next_midnight.isoformat()}")
         await asyncio.sleep(sleep_seconds)
 
         await _do_update("midnight schedule")
 
  # --- Helper Functions ---
+
+# Recently resolved queries; the same few inputs repeat heavily (pinned stops,
+# re-runs of a command), and the stop table only changes on reload, which
+# clears this. Flushed wholesale at the cap rather than tracking recency.
+_resolve_cache = {}
+_RESOLVE_CACHE_MAX = 256
+
 def resolve_stop_input(stop_name_input):
     """Finds a stop ID and real name from a user's input."""
+    _ensure_loaded()
     stop_name_input = stop_name_input.strip().lower()
-    # Simple search: find the first stop that contains the input string
-    result = stops[stops['stop_name'].str.lower().str.contains(stop_name_input, case=False, na=False)]
-    if not result.empty:
-        return result.iloc[0]['stop_id'], result.iloc[0]['stop_name']
-    return None, None
+    cached = _resolve_cache.get(stop_name_input)
+    if cached is not None:
+        return cached
+    # Scan the precomputed lowercased names and return at the first hit,
+    # instead of materialising a boolean mask over every stop
+    found = (None, None)
+    if _stop_names_lower is not None:
+        for i, name in enumerate(_stop_names_lower):
+            if stop_name_input in name:
+                found = (_stop_ids_arr[i], _stop_names_arr[i])
+                break
+    else:
+        result = stops[stops['stop_name'].str.lower().str.contains(stop_name_input, case=False, na=False)]
+        if not result.empty:
+            found = (result.iloc[0]['stop_id'], result.iloc[0]['stop_name'])
+    if len(_resolve_cache) >= _RESOLVE_CACHE_MAX:
+        _resolve_cache.clear()
+    _resolve_cache[stop_name_input] = found
+    return found
+
+# Active service ids memoised per date; the calendar only changes when the
+# static feed is reloaded, at which point load_gtfs_data clears this.
+_service_ids_cache = {}
 
 def get_service_ids_for_day(date_obj):
     """Gets all active service_ids for a given date."""
+    _ensure_loaded()
+    cached = _service_ids_cache.get(date_obj)
+    if cached is not None:
+        return cached
     day_name = date_obj.strftime('%A').lower()
     date_str = date_obj.strftime('%Y%m%d')
 
@@ -438,6 +894,7 @@ def get_service_ids_for_day(date_obj):
     removed = exceptions[exceptions['exception_type'] == '2']['service_id']
     service_ids.difference_update(removed)
 
+    _service_ids_cache[date_obj] = service_ids
     return service_ids
 
 # --- Railbus detection helper ---
@@ -453,6 +910,7 @@ def get_railbus_activity_for_date(termini_candidates, date_obj=None):
     Returns:
         dict mapping terminus_name -> bool (True if railbus routes appear to operate for that terminus).
     """
+    _ensure_loaded()
     if date_obj is None:
         date_obj = datetime.now().astimezone().date()
 
@@ -462,7 +920,7 @@ def get_railbus_activity_for_date(termini_candidates, date_obj=None):
         return {t: False for t in termini_candidates}
 
     # Limit trips to those that run today
-    trips_today = trips[trips['service_id'].isin(service_ids)]
+    trips_today = trips[_isin_codes(trips['service_id'], service_ids)]
 
     if trips_today.empty:
         return {t: False for t in termini_candidates}
@@ -524,6 +982,7 @@ def get_rail_replacement_status_for_date(date_obj=None, lookahead_days: int = 7)
         reasons_current: dict[str, list[str]]
         reasons_upcoming: dict[str, list[str]]
     """
+    _ensure_loaded()
     if date_obj is None:
         date_obj = datetime.now().astimezone().date()
 
@@ -535,6 +994,7 @@ def get_rail_replacement_status_for_date(date_obj=None, lookahead_days: int = 7)
     reasons_current: dict[str, list[str]] = {}
     reasons_upcoming: dict[str, list[str]] = {}
 
+    railrepl_config = _get_railrepl_config()
     if not railrepl_config:
         return current_termini, upcoming_termini, reasons_current, reasons_upcoming
 
@@ -591,7 +1051,7 @@ def get_rail_replacement_status_for_date(date_obj=None, lookahead_days: int = 7)
         route_ids = route_short_to_ids.get(short_name, set())
         if not route_ids:
             # Helpful debug for misconfigured short names
-            print(f"railrepl warning: no GTFS route_short_name '{short_name}' found for terminus '{term}'")
+            logger.warning(f"railrepl warning: no GTFS route_short_name '{short_name}' found for terminus '{term}'")
             continue
 
         for d in dates_list:
@@ -599,12 +1059,11 @@ def get_rail_replacement_status_for_date(date_obj=None, lookahead_days: int = 7)
             if not service_ids:
                 continue
 
-            trips_for_route_day = trips[
-                trips['route_id'].isin(route_ids) &
-                trips['service_id'].isin(service_ids)
-            ]
-
-            if trips_for_route_day.empty:
+            # route_service_pairs holds every (route_id, service_id) with a
+            # trip, so "does this replacement route run on d" is a handful of
+            # set lookups rather than two isin masks over all of trips
+            if not any((rid, sid) in route_service_pairs
+                       for rid in route_ids for sid in service_ids):
                 continue
 
             # At least one trip for this replacement route runs on this date
@@ -619,58 +1078,152 @@ def get_rail_replacement_status_for_date(date_obj=None, lookahead_days: int = 7)
 
     return current_termini, upcoming_termini, reasons_current, reasons_upcoming
 
+def _isin_codes(col, values):
+    """Boolean mask for col.isin(values), comparing category codes when possible.
+
+    For categorical columns this maps the wanted values onto the category
+    index once and runs np.isin over the integer codes; other dtypes fall
+    back to the regular hashing isin.
+    """
+    try:
+        wanted = col.cat.categories.get_indexer(list(values))
+        return np.isin(col.cat.codes.to_numpy(), wanted[wanted >= 0])
+    except AttributeError:
+        return col.isin(values).to_numpy()
+
+def _take_rows(df, index_map, keys):
+    """Collect the rows of df for the given keys using a precomputed groupby index."""
+    arrays = [index_map[k] for k in keys if k in index_map]
+    if not arrays:
+        return df.iloc[0:0]
+    if len(arrays) == 1:
+        return df.iloc[arrays[0]]
+    return df.iloc[np.concatenate(arrays)]
+
+def get_platform(name):
+    """Extract a platform number or letter from a stop name."""
+    # Regex to find 'Platform X', 'Stop Y', or a number at the end of the string
+    match = re.search(r'(?:Platform|Stop)\s*(\w+)|(\d+)$', str(name))
+    if match:
+        # Return the first non-None group from the match
+        return next((g for g in match.groups() if g is not None), '-')
+    return '-'
+
+def _platform_series(names):
+    """Vectorized get_platform over a whole stop_name column."""
+    groups = names.astype(str).str.extract(r'(?:Platform|Stop)\s*(\w+)|(\d+)$')
+    # bfill across the two capture groups picks the first non-null one,
+    # matching the scalar helper's group preference
+    return groups.bfill(axis=1).iloc[:, 0].fillna('-')
+
+_SCHEDULE_COLUMNS = ['trip_id', 'stop_id', 'arrival_dt', 'route_short_name', 'trip_headsign',
+                     'route_color', 'stop_name', 'platform']
+
 def get_scheduled_departures(stop_ids, now_local):
     """Gets scheduled departures for a given list of stop IDs."""
+    _ensure_loaded()
+    if not stop_departure_index:
+        return _get_scheduled_departures_merge(stop_ids, now_local)
+
     today = now_local.date()
     yesterday = today - timedelta(days=1)
-
     service_ids_today = get_service_ids_for_day(today)
     service_ids_yesterday = get_service_ids_for_day(yesterday)
 
-    trips_today = trips[trips['service_id'].isin(service_ids_today)]
-    trips_yesterday = trips[trips['service_id'].isin(service_ids_yesterday)]
+    today_start_local = now_local.replace(hour=0, minute=0, second=0, microsecond=0)
+    now_sec = (now_local - today_start_local).total_seconds()
 
-    # Filter stop_times for all stop_ids in the provided list
-    stop_services = stop_times[stop_times['stop_id'].isin(stop_ids)]
+    rows = []
+    for sid in stop_ids:
+        entry = stop_departure_index.get(str(sid))
+        if entry is None:
+            continue
+        arr_sec, trip_ids_arr = entry
+        stop_name, platform = _stop_meta.get(str(sid), (None, '-'))
+        # Today's service day: everything at/after now
+        for day_start, offset, service_ids in (
+            (today_start_local, 0.0, service_ids_today),
+            # Yesterday's service day only matters for overnight times that
+            # land at/after now once shifted back a day
+            (today_start_local - timedelta(days=1), 86400.0, service_ids_yesterday),
+        ):
+            start = int(np.searchsorted(arr_sec, now_sec + offset, side='left'))
+            for i in range(start, len(arr_sec)):
+                tid = trip_ids_arr[i]
+                disp = trip_display.get(tid)
+                if disp is None or disp[0] not in service_ids:
+                    continue
+                rows.append((tid, sid, day_start + timedelta(seconds=float(arr_sec[i])),
+                             disp[2], disp[1], disp[3], stop_name, platform))
 
-    def parse_arrival(time_str, day_start):
-        try:
-            h, m, s = map(int, time_str.split(':'))
-            return day_start.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(hours=h, minutes=m, seconds=s)
-        except ValueError:
-            return None
+    return pd.DataFrame(rows, columns=_SCHEDULE_COLUMNS)
 
-    today_start_local = now_local.replace(hour=0, minute=0, second=0, microsecond=0)
-    yesterday_start_local = today_start_local - timedelta(days=1)
+def _get_scheduled_departures_merge(stop_ids, now_local):
+    """Merge-based fallback used when the departure index failed to build."""
+    today = now_local.date()
+    yesterday = today - timedelta(days=1)
 
-    services_today_df = stop_services.merge(trips_today, on='trip_id')
-    services_today_df['arrival_dt'] = services_today_df['arrival_time'].apply(parse_arrival, args=(today_start_local,))
+    service_ids_today = get_service_ids_for_day(today)
+    service_ids_yesterday = get_service_ids_for_day(yesterday)
 
-    services_yesterday_df = stop_services.merge(trips_yesterday, on='trip_id')
-    services_yesterday_df['arrival_dt'] = services_yesterday_df['arrival_time'].apply(parse_arrival, args=(yesterday_start_local,))
+    trips_today = _take_rows(trips, trips_by_service, service_ids_today)
+    trips_yesterday = _take_rows(trips, trips_by_service, service_ids_yesterday)
 
-    all_services = pd.concat([services_yesterday_df, services_today_df])
-    all_services.dropna(subset=['arrival_dt'], inplace=True)
-    future_services = all_services[all_services['arrival_dt'] >= now_local].copy()
+    # Gather stop_times rows for all stop_ids via the precomputed index
+    stop_services = _take_rows(stop_times, stop_times_by_stop, stop_ids)
 
-    merged = future_services.merge(routes, on='route_id')
-    merged_with_stops = merged.merge(stops[['stop_id', 'stop_name']], on='stop_id')
-    
-    # Extract platform number or letter from stop_name
-    def get_platform(name):
-        # Regex to find 'Platform X', 'Stop Y', or a number at the end of the string
-        match = re.search(r'(?:Platform|Stop)\s*(\w+)|(\d+)$', name)
-        if match:
-            # Return the first non-None group from the match
-            return next((g for g in match.groups() if g is not None), '-')
-        return '-'
-
-    merged_with_stops['platform'] = merged_with_stops['stop_name'].apply(get_platform)
+    today_start_local = now_local.replace(hour=0, minute=0, second=0, microsecond=0)
+    yesterday_start_local = today_start_local - timedelta(days=1)
+
+    # to_timedelta parses the whole column in C; GTFS times past 24:00:00
+    # (overnight runs) come back as >1 day offsets, which is exactly what the
+    # old per-row parser computed with timedelta arithmetic.
+    services_today_df = stop_services.merge(trips_today, on='trip_id')
+    services_today_df['arrival_dt'] = today_start_local + pd.to_timedelta(services_today_df['arrival_time'], errors='coerce')
+
+    # Only trips running past midnight (arrival hour >= 24) can still be due
+    # today on yesterday's service day, so drop everything else before the
+    # merge — that removes nearly all of yesterday's rows up front.
+    overnight_services = stop_services[stop_services['arrival_time'].astype(str).str.slice(0, 2) >= '24']
+    services_yesterday_df = overnight_services.merge(trips_yesterday, on='trip_id')
+    services_yesterday_df['arrival_dt'] = yesterday_start_local + pd.to_timedelta(services_yesterday_df['arrival_time'], errors='coerce')
+
+    # Vectorized datetime64 comparisons; NaT rows compare False and fall out
+    # here, so no separate dropna (or defensive copy) is needed. Filtering
+    # before combining means the usual case (no overnight leftovers from
+    # yesterday) never copies today's rows through a concat.
+    future_today = services_today_df[services_today_df['arrival_dt'] >= now_local]
+    future_yesterday = services_yesterday_df[services_yesterday_df['arrival_dt'] >= now_local]
+    if future_yesterday.empty:
+        future_services = future_today
+    elif future_today.empty:
+        future_services = future_yesterday
+    else:
+        future_services = pd.concat([future_yesterday, future_today])
+
+    # route_short_name / route_color already live on trips (denormalised at
+    # load), so only the stop names still need joining in.
+    merged_with_stops = future_services.merge(stops[['stop_id', 'stop_name']], on='stop_id')
+
+    merged_with_stops['platform'] = _platform_series(merged_with_stops['stop_name'])
     
     return merged_with_stops
 
+@dataclass(slots=True)
+class Service:
+    """One upcoming departure at a stop, scheduled or realtime-adjusted."""
+    scheduled_time: datetime
+    eta_time: datetime
+    route_name: str
+    destination: str
+    is_realtime: bool
+    route_color: str
+    platform: str
+
+
 async def get_next_services(stop_ids: list[str], service_count: int = 8):
     """Fetches and merges scheduled and real-time data for a list of stop IDs."""
+    _ensure_loaded()
     if not stop_ids:
         return None, "No stop IDs provided."
 
@@ -681,60 +1234,69 @@ async def get_next_services(stop_ids: list[str], service_count: int = 8):
 
     now_local = datetime.now().astimezone()
 
-    # 1. Get scheduled departures for all stop_ids
-    scheduled_df = get_scheduled_departures(stop_ids, now_local)
+    # 1 + 2. Compute scheduled departures and refresh the TripUpdates map
+    # concurrently: the pandas work runs in a worker thread while the
+    # realtime fetch (or its 10s cache hit) resolves, so the request takes
+    # max() of the two instead of their sum.
+    scheduled_df, rt_updates = await asyncio.gather(
+        asyncio.to_thread(get_scheduled_departures, stop_ids, now_local),
+        _get_trip_updates_map(),
+    )
     scheduled_services = {}
-    for _, row in scheduled_df.iterrows():
-        # Use a unique key combining trip_id and stop_id to handle the same trip across multiple platforms
-        service_key = f"{row['trip_id']}-{row['stop_id']}"
-        scheduled_services[service_key] = {
-            'scheduled_time': row['arrival_dt'],
-            'eta_time': row['arrival_dt'],
-            'route_name': row['route_short_name'],
-            'destination': row['trip_headsign'],
-            'is_realtime': False,
-            'route_color': row.get('route_color', 'FFFFFF'),
-            'platform': row.get('platform', '-') # Get platform info
-        }
-
-    # 2. Get and merge real-time data
-    url = "https://gtfsrt.api.translink.com.au/api/realtime/SEQ/TripUpdates"
-    feed = gtfs_realtime_pb2.FeedMessage()
+    if not scheduled_df.empty:
+        colours = (scheduled_df['route_color'].fillna('FFFFFF').to_numpy()
+                   if 'route_color' in scheduled_df.columns
+                   else np.full(len(scheduled_df), 'FFFFFF'))
+        platforms = (scheduled_df['platform'].to_numpy()
+                     if 'platform' in scheduled_df.columns
+                     else np.full(len(scheduled_df), '-'))
+        # zip over the columns instead of iterrows: no per-row Series gets
+        # built. arrival_dt is iterated as a pandas column so the tz-aware
+        # Timestamps survive (to_numpy would strip the timezone).
+        for trip_id, stop_id, arrival_dt, route_name, destination, colour, platform in zip(
+            scheduled_df['trip_id'].to_numpy(),
+            scheduled_df['stop_id'].to_numpy(),
+            scheduled_df['arrival_dt'],
+            scheduled_df['route_short_name'].to_numpy(),
+            scheduled_df['trip_headsign'].to_numpy(),
+            colours,
+            platforms,
+        ):
+            # Unique key combining trip_id and stop_id to handle the same trip
+            # across multiple platforms; a tuple avoids formatting a string
+            # per row and per stop_time_update
+            service_key = (trip_id, stop_id)
+            scheduled_services[service_key] = Service(
+                scheduled_time=arrival_dt,
+                eta_time=arrival_dt,
+                route_name=route_name,
+                destination=destination,
+                is_realtime=False,
+                route_color=colour,
+                platform=platform,
+            )
+
+    # 3. Merge real-time data into the scheduled map. The parsed map is keyed
+    # exactly like scheduled_services, so this walks the (small) scheduled
+    # side rather than the network-wide feed.
     updates_found = 0
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=10) as resp:
-                if resp.status == 200:
-                    data = await resp.read()
-                    feed.ParseFromString(data)
-                    print(f"Successfully fetched and parsed real-time data. {len(feed.entity)} entities found.")
-                else:
-                    print(f"Failed to fetch real-time data. Status: {resp.status}")
-    except Exception as e:
-        print(f"Could not fetch or parse real-time data: {e}")
-
-    now_utc = datetime.now(timezone.utc)
-    for entity in feed.entity:
-        if entity.HasField('trip_update'):
-            trip_id = entity.trip_update.trip.trip_id
-            for stu in entity.trip_update.stop_time_update:
-                service_key = f"{trip_id}-{stu.stop_id}"
-                if service_key in scheduled_services:
-                    arrival_ts = stu.arrival.time if stu.HasField('arrival') else stu.departure.time
-                    if arrival_ts:
-                        arrival_dt_utc = datetime.fromtimestamp(arrival_ts, timezone.utc)
-                        if arrival_dt_utc >= now_utc:
-                            scheduled_services[service_key]['eta_time'] = arrival_dt_utc.astimezone(now_local.tzinfo)
-                            scheduled_services[service_key]['is_realtime'] = True
-                            updates_found += 1
+    # Compare the feed's raw POSIX timestamps against a single epoch float;
+    # a datetime is only constructed for updates that actually get stored
+    now_ts = now_local.timestamp()
+    local_tz = now_local.tzinfo
+    if rt_updates:
+        for key, svc in scheduled_services.items():
+            arrival_ts = rt_updates.get(key)
+            if arrival_ts and arrival_ts >= now_ts:
+                svc.eta_time = datetime.fromtimestamp(arrival_ts, local_tz)
+                svc.is_realtime = True
+                updates_found += 1
     
-    print(f"Matched {updates_found} real-time updates to scheduled services.")
-
     # 4. Prepare for display
     # Since a trip might appear multiple times if it stops at multiple platforms in the list,
     # we need to decide how to handle it. For now, we'll just combine and sort them.
-    upcoming = sorted(list(scheduled_services.values()), key=lambda x: x['eta_time'])
-    return upcoming[:service_count], stop_real_name
+    upcoming = heapq.nsmallest(service_count, scheduled_services.values(), key=attrgetter('eta_time'))
+    return upcoming, stop_real_name
 
 # --- Main Execution ---
 async def main():
@@ -749,12 +1311,12 @@ async def main():
     print(f"--- Next {service_count} Departures at {stop_name} ---")
     now = datetime.now().astimezone()
     for service in upcoming_services:
-        rt_marker = "[RT]" if service['is_realtime'] else "    "
-        eta_time_str = service['eta_time'].strftime("%H:%M")
-        time_diff_minutes = int((service['eta_time'] - now).total_seconds() // 60)
+        rt_marker = "[RT]" if service.is_realtime else "    "
+        eta_time_str = service.eta_time.strftime("%H:%M")
+        time_diff_minutes = int((service.eta_time - now).total_seconds() // 60)
         eta_diff_str = f"{time_diff_minutes} mins"
 
-        print(f"{rt_marker} {service['route_name']:<4} to {service['destination']:<35} | {eta_time_str} ({eta_diff_str})")
+        print(f"{rt_marker} {service.route_name:<4} to {service.destination:<35} | {eta_time_str} ({eta_diff_str})")
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file